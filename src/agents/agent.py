@@ -1,8 +1,15 @@
+import random
+from environment.grid import SPEED_BOOST_TURNS
+
+
 class Agent:
-    def __init__(self, name, start_pos):
+    def __init__(self, name, start_pos, rng=None):
         self.name = name
+        self.rng = rng or random  # random.Random for the random moves (default: the global random module)
         self.position = start_pos
         self.speed_boost_turns = 0
+        self.search_stats = None  # SearchStats of the last choose_action, if it searched
+        self.opponent = None  # The other agent, set by GameSimulator (full-state searches read its items)
 
         self.inventory = {
             "wall_builder": 0,
@@ -10,7 +17,7 @@ class Agent:
         }
 
     def activate_speed_boost(self):
-        self.speed_boost_turns = 3
+        self.speed_boost_turns = SPEED_BOOST_TURNS
     
     def add_to_inventory(self, item_type):
         if item_type in self.inventory:
@@ -1,34 +1,72 @@
-import random
 from agents.agent import Agent
 from algorithms.astar import AStar
+from algorithms.dstar_lite import DStarLite
+from algorithms.jps import JumpPointSearch
 from algorithms.minimax import Minimax
+from algorithms.tablebase import Tablebase
 
 class Catcher(Agent):
-    def __init__(self, name, start_pos, strategy, minimax_depth):
-        super().__init__(name, start_pos)
+    def __init__(self, name, start_pos, strategy, minimax_depth=3, time_budget_ms=None, parallel_workers=None,
+                 full_state=False, rng=None):
+        super().__init__(name, start_pos, rng)
         self.strategy = strategy
         self.astar = None
+        self.dstar_lite = None
         self.minimax = None
+        self.tablebase = None
         self.minimax_depth = minimax_depth
+        self.time_budget_ms = time_budget_ms
+        self.parallel_workers = parallel_workers
+        self.full_state = full_state
     
     def choose_action(self, env):
+        self.search_stats = None
         runner_pos = env.agents.get("runner")
         if not runner_pos:
             return None
         
-        if self.strategy == "astar":
+        if self.strategy == "tablebase":
+            if self.tablebase is None:
+                self.tablebase = Tablebase.load(env)
+            
+            action = self.tablebase.best_move(env, self.position, runner_pos, is_catcher=True)
+            if action:
+                return action
+            # Walls placed, an agent inside a wall or an escape position: use A*
+        
+        if self.strategy in ["astar", "tablebase", "jps", "hpa"]:
             if self.astar is None:
-                self.astar = AStar(env)
+                # Jump Point Search: same path lengths, far fewer expansions on open maps
+                # HPA*: approximate paths through sectors, for very large maps
+                if self.strategy == "jps":
+                    self.astar = JumpPointSearch(env)
+                else:
+                    self.astar = AStar(env, use_hierarchy=self.strategy == "hpa")
             
             action = self.astar.get_next_action(self.position, runner_pos)
+            self.search_stats = self.astar.stats
+            if action:
+                return action
+        
+        elif self.strategy == "dstar_lite":
+            # Incremental A*: the search state is kept and repaired between moves
+            if self.dstar_lite is None:
+                self.dstar_lite = DStarLite(env)
+            
+            action = self.dstar_lite.get_next_action(self.position, runner_pos)
+            self.search_stats = self.dstar_lite.stats
             if action:
                 return action
         
         elif self.strategy == "minimax":
             if self.minimax is None:
-                self.minimax = Minimax(env, max_depth=self.minimax_depth)
+                # With a time budget the search deepens iteratively instead of using a fixed depth
+                depth = None if self.time_budget_ms is not None else self.minimax_depth
+                self.minimax = Minimax(env, max_depth=depth, time_budget_ms=self.time_budget_ms,
+                                       parallel_workers=self.parallel_workers, full_state=self.full_state)
             
-            result = self.minimax.get_best_action_catcher(self.position, runner_pos, self)
+            result = self.minimax.get_best_action_catcher(self.position, runner_pos, self, self.opponent)
+            self.search_stats = self.minimax.stats
             if result:
                 action_type, direction, wall_pos = result
                 
@@ -54,6 +92,6 @@ class Catcher(Agent):
                 valid_directions.append(direction)
         
         if valid_directions:
-            return random.choice(valid_directions)
+            return self.rng.choice(valid_directions)
         
         return None
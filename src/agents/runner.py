@@ -1,22 +1,34 @@
-import random
 from agents.agent import Agent
 from algorithms.minimax import Minimax
+from algorithms.tablebase import Tablebase
 
 class Runner(Agent):
-    def __init__(self, name, start_pos, strategy, minimax_depth):
+    def __init__(self, name, start_pos, strategy, minimax_depth=3, time_budget_ms=None, parallel_workers=None,
+                 full_state=False, rng=None):
         """
         Initialize Runner agent.
         
         Args:
             name: Agent name
             start_pos: Starting position (row, col)
-            strategy: "greedy", "minimax", or "random"
+            strategy: "greedy", "minimax", "tablebase" or "random"
             minimax_depth: Search depth for minimax algorithm (default: 3)
+            time_budget_ms: Per-move time budget for minimax; when set, the search
+                deepens iteratively until it runs out instead of using minimax_depth
+            parallel_workers: Number of processes scoring the minimax root actions
+                in parallel (fixed-depth searches only)
+            full_state: Minimax searches GameStates, with items, speed boosts and
+                power-up pickups simulated inside the tree
+            rng: random.Random for the random moves (default: the global random module)
         """
-        super().__init__(name, start_pos)
+        super().__init__(name, start_pos, rng)
         self.strategy = strategy
         self.minimax = None
+        self.tablebase = None
         self.minimax_depth = minimax_depth
+        self.time_budget_ms = time_budget_ms
+        self.parallel_workers = parallel_workers
+        self.full_state = full_state
     
     def manhattan_distance(self, pos1, pos2):
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
@@ -34,6 +46,7 @@ class Runner(Agent):
         return self.position
     
     def choose_action(self, env):
+        self.search_stats = None
         catcher_pos = env.agents.get("catcher")
         if not catcher_pos:
             return None
@@ -44,7 +57,16 @@ class Runner(Agent):
         if not valid:
             return None
         
-        if self.strategy == "greedy":
+        if self.strategy == "tablebase":
+            if self.tablebase is None:
+                self.tablebase = Tablebase.load(env)
+            
+            action = self.tablebase.best_move(env, catcher_pos, self.position, is_catcher=False)
+            if action:
+                return action
+            # Walls placed or an agent inside a wall: the table no longer applies, play greedy
+        
+        if self.strategy in ["greedy", "tablebase"]:
             best_move = None
             max_distance = -1
             
@@ -60,9 +82,13 @@ class Runner(Agent):
         
         elif self.strategy == "minimax":
             if self.minimax is None:
-                self.minimax = Minimax(env, max_depth=self.minimax_depth)
+                # With a time budget the search deepens iteratively instead of using a fixed depth
+                depth = None if self.time_budget_ms is not None else self.minimax_depth
+                self.minimax = Minimax(env, max_depth=depth, time_budget_ms=self.time_budget_ms,
+                                       parallel_workers=self.parallel_workers, full_state=self.full_state)
             
-            result = self.minimax.get_best_action_runner(catcher_pos, self.position, self)
+            result = self.minimax.get_best_action_runner(catcher_pos, self.position, self, self.opponent)
+            self.search_stats = self.minimax.stats
             if result:
                 action_type, direction, wall_pos = result
                 
@@ -83,5 +109,5 @@ class Runner(Agent):
                     return direction
         
         # Fallback to random move
-        return random.choice(valid) if valid else None
+        return self.rng.choice(valid) if valid else None
         
@@ -1,8 +1,54 @@
 import heapq
+from algorithms.hpa import HierarchicalPathfinder
+from algorithms.search_stats import SearchStats
 
 class AStar:
-    def __init__(self, env):
+    """
+    A* on flat cell ids (row * cols + col) with a precomputed neighbor table; g-scores and parents
+    live in arrays reused by every search (a stamp marks the current entries).
+    With use_hierarchy the queries go to HPA* instead (approximate paths, for very large maps).
+    """
+    
+    def __init__(self, env, use_hierarchy=False):
         self.env = env
+        self.stats = SearchStats()
+        self.hierarchy = HierarchicalPathfinder(env, stats=self.stats) if use_hierarchy else None
+        
+        cells = env.rows * env.cols
+        self.row_of = [cell // env.cols for cell in range(cells)]
+        self.col_of = [cell % env.cols for cell in range(cells)]
+        self.step_direction = {-env.cols: "up", env.cols: "down", -1: "left", 1: "right"}
+        
+        self.g_score = [0] * cells
+        self.parent = [0] * cells
+        self.seen = [0] * cells  # Search stamp of the last search that reached the cell
+        self.closed = [0] * cells  # Search stamp of the last search that expanded the cell
+        self.search_id = 0
+        
+        self.build_neighbor_table()
+    
+    def build_neighbor_table(self):
+        """
+        neighbors[cell] = ids of the free cells next to it: a list copy of the
+        environment's neighbor_table rows (lists of lists are the fastest to
+        iterate in the search loop).
+        """
+        env = self.env
+        self.neighbors = [env.free_neighbors(cell).tolist() for cell in range(env.rows * env.cols)]
+        self.synced_walls = len(env.wall_changes)
+    
+    def sync_walls(self):
+        """Copy the neighbor_table rows changed by walls placed or removed since the last sync."""
+        wall_changes = self.env.wall_changes
+        while self.synced_walls < len(wall_changes):
+            row, col = wall_changes[self.synced_walls]
+            self.synced_walls += 1
+            
+            wall = row * self.env.cols + col
+            # Wall cells keep neighbor lists too (ghost mode starts), so check all four sides
+            for cell in (wall - self.env.cols, wall + self.env.cols, wall - 1, wall + 1):
+                if 0 <= cell < len(self.neighbors):
+                    self.neighbors[cell] = self.env.free_neighbors(cell).tolist()
     
     def heuristic(self, pos1, pos2):
         """Distanza di Manhattan come euristica."""
@@ -10,49 +56,78 @@ class AStar:
     
     def get_neighbors(self, pos):
         """Ritorna le celle vicine valide (no muri)."""
-        neighbors = []
-        directions = [("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1)]
-        
-        for direction, dr, dc in directions:
-            new_pos = (pos[0] + dr, pos[1] + dc)
-            if (0 <= new_pos[0] < self.env.rows and 
-                0 <= new_pos[1] < self.env.cols and 
-                self.env.grid[new_pos[0], new_pos[1]] == 0):
-                neighbors.append((direction, new_pos))
-        
-        return neighbors
+        self.sync_walls()
+        cell = pos[0] * self.env.cols + pos[1]
+        return [(self.step_direction[neighbor - cell], (self.row_of[neighbor], self.col_of[neighbor]))
+                for neighbor in self.neighbors[cell]]
     
     def find_path(self, start, goal):
         if start == goal:
             return []
+        if self.hierarchy is not None:
+            return self.hierarchy.find_path(start, goal)
+        
+        self.sync_walls()
+        cols = self.env.cols
+        start_cell = start[0] * cols + start[1]
+        goal_cell = goal[0] * cols + goal[1]
+        goal_row, goal_col = goal
+        
+        self.search_id += 1
+        stamp = self.search_id
+        g_score, parent, seen, closed = self.g_score, self.parent, self.seen, self.closed
+        neighbors, row_of, col_of = self.neighbors, self.row_of, self.col_of
+        
+        g_score[start_cell] = 0
+        parent[start_cell] = -1
+        seen[start_cell] = stamp
         
         counter = 0
-        frontier = [(0, counter, start, [])]
-        visited = set()
+        frontier = [(0, counter, start_cell)]
         
         while frontier:
-            f_score, _, current, path = heapq.heappop(frontier)
+            _, _, current = heapq.heappop(frontier)
             
-            if current in visited:
+            if closed[current] == stamp:
                 continue
+            closed[current] = stamp
             
-            visited.add(current)
+            if current == goal_cell:
+                return self.reconstruct_path(current)
             
-            if current == goal:
-                return path
+            self.stats.nodes_expanded += 1
+            next_g = g_score[current] + 1
             
-            for direction, neighbor in self.get_neighbors(current):
-                if neighbor not in visited:
-                    g_score = len(path) + 1
-                    h_score = self.heuristic(neighbor, goal)
-                    f_score = g_score + h_score
-                    
-                    counter += 1
-                    heapq.heappush(frontier, (f_score, counter, neighbor, path + [direction]))
+            for neighbor in neighbors[current]:
+                # Only a strictly better g-score is pushed: with ties the earlier
+                # entry is popped first anyway, so the path is the same
+                if closed[neighbor] == stamp or (seen[neighbor] == stamp and next_g >= g_score[neighbor]):
+                    continue
+                
+                seen[neighbor] = stamp
+                g_score[neighbor] = next_g
+                parent[neighbor] = current
+                
+                f_score = next_g + abs(row_of[neighbor] - goal_row) + abs(col_of[neighbor] - goal_col)
+                counter += 1
+                heapq.heappush(frontier, (f_score, counter, neighbor))
         
         return None
     
+    def reconstruct_path(self, cell):
+        path = []
+        parent = self.parent
+        while parent[cell] != -1:
+            previous = parent[cell]
+            path.append(self.step_direction[cell - previous])
+            cell = previous
+        path.reverse()
+        return path
+    
     def get_next_action(self, start, goal):
+        self.stats.reset()
+        if self.hierarchy is not None:
+            return self.hierarchy.next_step(start, goal)  # Only the first move is refined
         path = self.find_path(start, goal)
         if path and len(path) > 0:
             return path[0]
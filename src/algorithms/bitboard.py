@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class Bitboard:
+    """
+    Flood fills over the free cells as one Python big int: bit row * width + col, with width = cols + 1
+    so the never-free extra column stops shifts from wrapping. One BFS layer is four shifts, an OR and
+    an AND. Walls are synced from env.wall_changes; extra_walls are cleared from a copy of the mask.
+    """
+
+    MAX_CELLS = 1 << 16  # Each layer costs a few operations on rows * (cols + 1) bits
+
+    def __init__(self, env):
+        self.env = env
+        self.width = env.cols + 1
+
+        free = np.zeros((env.rows, self.width), dtype=bool)
+        free[:, :env.cols] = env.grid == 0
+        self.free = int.from_bytes(np.packbits(free.ravel(), bitorder="little").tobytes(), "little")
+        self.synced_walls = len(env.wall_changes)
+
+    @classmethod
+    def fits(cls, env):
+        return env.rows * (env.cols + 1) <= cls.MAX_CELLS
+
+    def bit(self, pos):
+        return 1 << (pos[0] * self.width + pos[1])
+
+    def sync_walls(self):
+        wall_changes = self.env.wall_changes
+        while self.synced_walls < len(wall_changes):
+            pos = wall_changes[self.synced_walls]
+            self.synced_walls += 1
+            if self.env.walkable[pos[0] * self.env.cols + pos[1]]:
+                self.free |= self.bit(pos)
+            else:
+                self.free &= ~self.bit(pos)
+
+    def free_mask(self, extra_walls=None):
+        self.sync_walls()
+        free = self.free
+        if extra_walls:
+            for pos in extra_walls:
+                free &= ~self.bit(pos)
+        return free
+
+    def expand(self, cells, free):
+        """Free cells one move away from cells (cells themselves included when free)."""
+        width = self.width
+        return (cells | cells << 1 | cells >> 1 | cells << width | cells >> width) & free
+
+    def within(self, start, moves, extra_walls=None):
+        """Mask of the free cells reachable from start in at most moves moves (start included)."""
+        free = self.free_mask(extra_walls)
+        reached = self.bit(start)
+        for _ in range(moves):
+            grown = reached | self.expand(reached, free)
+            if grown == reached:
+                break
+            reached = grown
+        return reached
+
+    def distance(self, start, goal, extra_walls=None):
+        """Number of moves from start to goal (the same as Minimax.field_distance), infinity if unreachable."""
+        if start == goal:
+            return 0
+        free = self.free_mask(extra_walls)
+        goal_bit = self.bit(goal)
+        if not free & goal_bit:
+            return float('inf')
+
+        seen = frontier = self.bit(start)
+        steps = 0
+        while frontier:
+            steps += 1
+            frontier = self.expand(frontier, free) & ~seen
+            if frontier & goal_bit:
+                return steps
+            seen |= frontier
+        return float('inf')
+
+    def cells(self, mask):
+        """(row, col) of the set bits of a mask."""
+        width = self.width
+        positions = []
+        while mask:
+            low = mask & -mask
+            positions.append(divmod(low.bit_length() - 1, width))
+            mask ^= low
+        return positions
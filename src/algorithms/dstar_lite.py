@@ -0,0 +1,253 @@
+import heapq
+from algorithms.astar import AStar
+from algorithms.search_stats import SearchStats
+
+INF = float('inf')
+
+
+class DStarLite:
+    """
+    Incremental planner for the Catcher (Moving Target D* Lite), same interface as AStar.
+    The search state is kept between moves and repaired: km absorbs goal moves, walls
+    update their neighbors and a moved start keeps its subtree.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.stats = SearchStats()
+        self.fallback = AStar(env)  # For starts inside a wall (ghost mode)
+
+        cells = env.rows * env.cols
+        self.cols = env.cols
+        self.row_of = self.fallback.row_of
+        self.col_of = self.fallback.col_of
+        self.step_direction = self.fallback.step_direction
+        self.neighbors = self.fallback.neighbors  # Kept up to date by fallback.sync_walls
+
+        self.free = (env.grid == 0).ravel().tolist()
+        self.g = [INF] * cells
+        self.rhs = [INF] * cells
+        self.parent = [-1] * cells  # Neighbor that gives rhs (search tree)
+        self.queued_key = [None] * cells  # Current key of cells in the open list (stale heap entries are skipped)
+        self.open_list = []
+
+        self.key_scale = cells + 1  # Above any finite g
+        self.start = None
+        self.goal = None
+        self.goal_row = self.goal_col = 0
+        self.km = 0
+        self.synced_walls = len(env.wall_changes)
+
+    def heuristic(self, a, b):
+        return abs(self.row_of[a] - self.row_of[b]) + abs(self.col_of[a] - self.col_of[b])
+
+    def calculate_key(self, cell):
+        """The (k1, k2) key packed as k1 * key_scale + k2 (k2 < key_scale): same order, cheaper to compare."""
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self.heuristic(cell, self.goal) + self.km) * self.key_scale + best
+
+    def update_vertex(self, cell):
+        g, rhs = self.g, self.rhs
+        if cell != self.start:
+            best = INF
+            parent = -1
+            if self.free[cell]:
+                for neighbor in self.neighbors[cell]:  # Lowest g, ties to the first in neighbor order
+                    if g[neighbor] + 1 < best:
+                        best = g[neighbor] + 1
+                        parent = neighbor
+            rhs[cell] = best
+            self.parent[cell] = parent
+        else:
+            best = rhs[cell]
+
+        g_cell = g[cell]
+        if g_cell != best:
+            if g_cell < best:
+                best = g_cell
+            key = ((best + abs(self.row_of[cell] - self.goal_row) + abs(self.col_of[cell] - self.goal_col) + self.km)
+                   * self.key_scale + best)
+            if self.queued_key[cell] != key:  # Already queued with this key: no new heap entry
+                self.queued_key[cell] = key
+                heapq.heappush(self.open_list, (key, cell))
+        else:
+            self.queued_key[cell] = None
+
+    def top_key(self):
+        open_list = self.open_list
+        queued_key = self.queued_key
+        while open_list:
+            key, cell = open_list[0]
+            if queued_key[cell] == key:
+                return key
+            heapq.heappop(open_list)  # Stale entry
+        return INF
+
+    def compute_shortest_path(self):
+        """
+        The LPA* main loop, with the key computations and the top-of-heap and
+        neighbor updates written out inline (this loop is the planner's cost).
+        """
+        g, rhs, parent, free = self.g, self.rhs, self.parent, self.free
+        goal, start, km, scale = self.goal, self.start, self.km, self.key_scale
+        neighbors, queued_key, open_list = self.neighbors, self.queued_key, self.open_list
+        row_of, col_of, goal_row, goal_col = self.row_of, self.col_of, self.goal_row, self.goal_col
+        heappush, heappop = heapq.heappush, heapq.heappop
+        update_vertex = self.update_vertex
+        expanded = 0
+
+        while True:
+            # Top of the open list, skipping stale entries
+            while open_list and queued_key[open_list[0][1]] != open_list[0][0]:
+                heappop(open_list)
+            top = open_list[0][0] if open_list else INF
+            goal_best = g[goal] if g[goal] < rhs[goal] else rhs[goal]
+            if not (top < (goal_best + km) * scale + goal_best or rhs[goal] != g[goal]):
+                break
+
+            key_old, cell = heappop(open_list)
+            queued_key[cell] = None
+            g_cell, rhs_cell = g[cell], rhs[cell]
+            best = g_cell if g_cell < rhs_cell else rhs_cell
+            key_new = (best + abs(row_of[cell] - goal_row) + abs(col_of[cell] - goal_col) + km) * scale + best
+            expanded += 1
+
+            if key_old < key_new:
+                queued_key[cell] = key_new
+                heappush(open_list, (key_new, cell))
+            elif g_cell > rhs_cell:
+                g[cell] = rhs_cell
+                next_g = rhs_cell + 1
+                for neighbor in neighbors[cell]:
+                    # g[cell] went down: only neighbors whose rhs it reaches (ties included) can change
+                    if next_g > rhs[neighbor] or neighbor == start:
+                        continue
+                    # update_vertex(neighbor), inlined
+                    best = INF
+                    best_parent = -1
+                    if free[neighbor]:
+                        for other in neighbors[neighbor]:
+                            if g[other] + 1 < best:
+                                best = g[other] + 1
+                                best_parent = other
+                    rhs[neighbor] = best
+                    parent[neighbor] = best_parent
+                    g_neighbor = g[neighbor]
+                    if g_neighbor != best:
+                        if g_neighbor < best:
+                            best = g_neighbor
+                        key = ((best + abs(row_of[neighbor] - goal_row) + abs(col_of[neighbor] - goal_col) + km)
+                               * scale + best)
+                        if queued_key[neighbor] != key:
+                            queued_key[neighbor] = key
+                            heappush(open_list, (key, neighbor))
+                    else:
+                        queued_key[neighbor] = None
+            else:
+                g[cell] = INF
+                update_vertex(cell)
+                for neighbor in neighbors[cell]:
+                    update_vertex(neighbor)
+        self.stats.nodes_expanded += expanded
+
+    def apply_wall_changes(self):
+        wall_changes = self.env.wall_changes
+        while self.synced_walls < len(wall_changes):
+            row, col = wall_changes[self.synced_walls]
+            self.synced_walls += 1
+
+            wall = row * self.cols + col
+            free = self.env.walkable[wall] == 1
+            if free == self.free[wall]:
+                continue
+            self.free[wall] = free
+            if free:
+                self.start = None  # A removed wall can shorten any path: search again from scratch
+                continue
+            neighbors = self.neighbors[wall]  # The wall's own list is left untouched by sync_walls
+
+            if wall == self.start:
+                self.start = None  # The tree root is gone: search again from scratch
+            if self.start is None:
+                continue
+            self.update_vertex(wall)
+            for neighbor in neighbors:
+                self.update_vertex(neighbor)
+
+    def reset(self, start):
+        """Drop the whole search state and start a new search from start."""
+        cells = len(self.g)
+        self.g = [INF] * cells
+        self.rhs = [INF] * cells
+        self.parent = [-1] * cells
+        self.queued_key = [None] * cells
+        self.open_list = []
+        self.km = 0
+
+        self.start = start
+        self.rhs[start] = 0
+        self.update_vertex(start)
+
+    def move_start(self, start):
+        """Re-root the search at start, keeping the subtree below it (g shifted by g[start])."""
+        g, rhs, parent = self.g, self.rhs, self.parent
+        old_start = self.start
+        if old_start is None or parent[start] != old_start or g[start] != rhs[start]:
+            self.reset(start)
+            return
+
+        self.start = start
+        parent[start] = -1
+        parent[old_start] = -1
+        dropped = [old_start]
+        for cell in dropped:
+            for neighbor in self.neighbors[cell]:
+                if parent[neighbor] == cell:
+                    parent[neighbor] = -1  # Also marks the cell as visited
+                    dropped.append(neighbor)
+
+        for cell in dropped:
+            g[cell] = rhs[cell] = INF
+            self.queued_key[cell] = None
+        for cell in dropped:
+            self.update_vertex(cell)
+
+    def get_next_action(self, start, goal):
+        self.stats.reset()
+        start_cell = start[0] * self.cols + start[1]
+        goal_cell = goal[0] * self.cols + goal[1]
+
+        if start == goal:
+            return None
+
+        self.fallback.sync_walls()
+        self.apply_wall_changes()
+
+        if not self.free[start_cell]:
+            return self.fallback.get_next_action(start, goal)
+        if not self.free[goal_cell]:
+            return None  # The goal is inside a wall: unreachable, like AStar
+
+        if self.goal is None:
+            self.goal = goal_cell
+        elif goal_cell != self.goal:
+            self.km += self.heuristic(self.goal, goal_cell)
+            self.goal = goal_cell
+            if self.km > self.key_scale:
+                self.start = None  # km would break the packed keys (calculate_key): search again from scratch
+        self.goal_row, self.goal_col = goal
+
+        if start_cell != self.start:
+            self.move_start(start_cell)
+
+        self.compute_shortest_path()
+
+        if self.g[goal_cell] == INF:
+            return None
+
+        # Walk back the search tree from the goal to the cell after the start
+        parent = self.parent
+        cell = goal_cell
+        while parent[cell] != start_cell:
+            cell = parent[cell]
+        return self.step_direction[cell - start_cell]
@@ -0,0 +1,412 @@
+import heapq
+import numpy as np
+from algorithms.search_stats import SearchStats
+
+SECTOR_SIZE = 16
+LONG_ENTRANCE = 6  # Entrances at least this wide get a transition at both ends instead of one in the middle
+MAX_ENDPOINTS = 1024  # Cached endpoint searches, about 20 kB each with full sectors
+MAX_GOAL_TREES = 16  # Cached distance trees, a few MB each on a 1025 x 1025 map
+
+
+def sector_distances(free, sources):
+    """
+    BFS distances inside one sector from every source at once, as shifted
+    boolean masks: (len(sources), height, width) int32, -1 where unreachable.
+    """
+    count = len(sources)
+    source_rows, source_cols = zip(*sources)
+    reached = np.zeros((count,) + free.shape, dtype=bool)
+    reached[np.arange(count), source_rows, source_cols] = True
+    distance = np.where(reached, 0, -1).astype(np.int32)
+
+    frontier = reached.copy()
+    step = 0
+    while frontier.any():
+        step += 1
+        grown = np.zeros_like(frontier)
+        grown[:, 1:, :] |= frontier[:, :-1, :]
+        grown[:, :-1, :] |= frontier[:, 1:, :]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        frontier = grown & free & ~reached
+        reached |= frontier
+        distance[frontier] = step
+    return distance
+
+
+class HierarchicalPathfinder:
+    """
+    HPA* over a GridEnvironment, for maps too large for a flat search every turn. Each entrance
+    between two sector_size sectors gets one or two transitions; their cells are the nodes of an
+    abstract graph, with in-sector distances cached per sector. Distances are upper bounds (a few
+    percent long on long routes); a wall only rebuilds the entrances and caches around its sector.
+    """
+
+    def __init__(self, env, sector_size=SECTOR_SIZE, stats=None):
+        self.env = env
+        self.stats = stats if stats is not None else SearchStats()
+        self.rows, self.cols = env.rows, env.cols
+        self.sector_size = sector_size
+        self.sector_rows = -(-env.rows // sector_size)
+        self.sector_cols = -(-env.cols // sector_size)
+        self.step_direction = {-env.cols: "up", env.cols: "down", -1: "left", 1: "right"}
+
+        sectors = self.sector_rows * self.sector_cols
+        self.transitions = {}  # (sector, 0) -> pairs across its right border, (sector, 1) -> its bottom border
+        self.partners = {}  # node -> nodes across a border (a corner cell can have two)
+        self.sector_nodes = [[] for _ in range(sectors)]
+        self.intra = [None] * sectors  # node -> [(node, distance)] inside the sector, None until needed
+        self.endpoints = {}  # cell -> sector_search from it, dropped when a wall changes its sector
+        self.goal_trees = {}  # goal cell -> [settled, frontier, start] of a search towards it, dropped on any wall change
+
+        for sector in range(sectors):
+            for key in self.own_borders(sector):
+                self.build_border(key)
+        for sector in range(sectors):
+            self.sector_nodes[sector] = self.collect_nodes(sector)
+        self.synced_walls = len(env.wall_changes)
+
+    def sector_of(self, cell):
+        row, col = divmod(cell, self.cols)
+        return (row // self.sector_size) * self.sector_cols + col // self.sector_size
+
+    def sector_bounds(self, sector):
+        """First and last (inclusive) row and column of a sector."""
+        size = self.sector_size
+        i, j = divmod(sector, self.sector_cols)
+        return (i * size, min((i + 1) * size, self.rows) - 1,
+                j * size, min((j + 1) * size, self.cols) - 1)
+
+    def own_borders(self, sector):
+        i, j = divmod(sector, self.sector_cols)
+        borders = []
+        if j < self.sector_cols - 1:
+            borders.append((sector, 0))
+        if i < self.sector_rows - 1:
+            borders.append((sector, 1))
+        return borders
+
+    def touching_borders(self, sector):
+        """Borders of the sector with the side of their pairs that lies inside it (0 or 1)."""
+        i, j = divmod(sector, self.sector_cols)
+        borders = [(key, 0) for key in self.own_borders(sector)]
+        if j > 0:
+            borders.append(((sector - 1, 0), 1))
+        if i > 0:
+            borders.append(((sector - self.sector_cols, 1), 1))
+        return borders
+
+    def build_border(self, key):
+        """(Re)compute the transitions of one border and link them in partners."""
+        for a, b in self.transitions.get(key, ()):
+            self.partners[a].remove(b)
+            self.partners[b].remove(a)
+            if not self.partners[a]:
+                del self.partners[a]
+            if not self.partners[b]:
+                del self.partners[b]
+
+        sector, vertical = key
+        first_row, last_row, first_col, last_col = self.sector_bounds(sector)
+        walkable, cols = self.env.walkable, self.cols
+        if vertical == 0:
+            # Right border: cells of the last column facing the next column
+            sides = [(row * cols + last_col, row * cols + last_col + 1) for row in range(first_row, last_row + 1)]
+        else:
+            sides = [(last_row * cols + col, (last_row + 1) * cols + col) for col in range(first_col, last_col + 1)]
+
+        pairs = []
+        run = []
+        for a, b in sides + [(-1, -1)]:
+            if a >= 0 and walkable[a] and walkable[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) >= LONG_ENTRANCE:
+                    pairs.extend((run[0], run[-1]))
+                else:
+                    pairs.append(run[len(run) // 2])
+                run = []
+
+        self.transitions[key] = pairs
+        for a, b in pairs:
+            self.partners.setdefault(a, []).append(b)
+            self.partners.setdefault(b, []).append(a)
+
+    def collect_nodes(self, sector):
+        nodes = set()
+        for key, side in self.touching_borders(sector):
+            nodes.update(pair[side] for pair in self.transitions[key])
+        return sorted(nodes)
+
+    def sync_walls(self):
+        """Repair the sectors touched by walls placed or removed since the last sync."""
+        wall_changes = self.env.wall_changes
+        if self.synced_walls < len(wall_changes):
+            self.goal_trees = {}
+        while self.synced_walls < len(wall_changes):
+            row, col = wall_changes[self.synced_walls]
+            self.synced_walls += 1
+
+            sector = self.sector_of(row * self.cols + col)
+            for key, _ in self.touching_borders(sector):
+                self.build_border(key)
+            self.intra[sector] = None
+            self.endpoints = {cell: result for cell, result in self.endpoints.items()
+                              if self.sector_of(cell) != sector}
+
+            i, j = divmod(sector, self.sector_cols)
+            for di, dj in ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)):
+                if 0 <= i + di < self.sector_rows and 0 <= j + dj < self.sector_cols:
+                    other = sector + di * self.sector_cols + dj
+                    nodes = self.collect_nodes(other)
+                    if nodes != self.sector_nodes[other]:
+                        self.sector_nodes[other] = nodes
+                        self.intra[other] = None
+
+    def sector_search(self, source, sector):
+        """BFS from source that never leaves the sector. Returns (distance, parent) dicts."""
+        first_row, last_row, first_col, last_col = self.sector_bounds(sector)
+        walkable, cols = self.env.walkable, self.cols
+        distance = {source: 0}
+        parent = {source: -1}
+        frontier = [source]
+        steps = 0
+        while frontier:
+            steps += 1
+            next_frontier = []
+            for cell in frontier:
+                row, col = divmod(cell, cols)
+                candidates = []
+                if row > first_row:
+                    candidates.append(cell - cols)
+                if row < last_row:
+                    candidates.append(cell + cols)
+                if col > first_col:
+                    candidates.append(cell - 1)
+                if col < last_col:
+                    candidates.append(cell + 1)
+                for neighbor in candidates:
+                    if walkable[neighbor] and neighbor not in distance:
+                        distance[neighbor] = steps
+                        parent[neighbor] = cell
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return distance, parent
+
+    def endpoint_search(self, cell):
+        """sector_search from a query endpoint in its own sector, cached (searches reuse the same cells)."""
+        result = self.endpoints.get(cell)
+        if result is None:
+            if len(self.endpoints) >= MAX_ENDPOINTS:
+                self.endpoints = {}
+            result = self.sector_search(cell, self.sector_of(cell))
+            self.endpoints[cell] = result
+        return result
+
+    def intra_edges(self, sector):
+        edges = self.intra[sector]
+        if edges is None:
+            edges = {}
+            nodes = self.sector_nodes[sector]
+            if nodes:
+                first_row, last_row, first_col, last_col = self.sector_bounds(sector)
+                free = self.env.grid[first_row:last_row + 1, first_col:last_col + 1] == 0
+                local = [(node // self.cols - first_row, node % self.cols - first_col) for node in nodes]
+                distance = sector_distances(free, local)
+                node_rows, node_cols = zip(*local)
+                between = distance[:, node_rows, node_cols].tolist()  # between[i][j]: node i -> node j
+                for node, row in zip(nodes, between):
+                    edges[node] = [(other, d) for other, d in zip(nodes, row) if other != node and d >= 0]
+            self.intra[sector] = edges
+        return edges
+
+    def search(self, start, goal):
+        """
+        Abstract A* from a free start to goal (cell ids): (distance, hops ending with goal,
+        start_parent) or None.
+        """
+        if not self.env.walkable[goal]:
+            return None
+
+        start_sector, goal_sector = self.sector_of(start), self.sector_of(goal)
+        start_distance, start_parent = self.endpoint_search(start)
+        goal_distance, _ = self.endpoint_search(goal)
+        goal_row, goal_col = divmod(goal, self.cols)
+
+        def links(node):
+            if node == start:
+                found = [(other, start_distance[other]) for other in self.sector_nodes[start_sector]
+                         if other in start_distance and other != start]
+                if start_sector == goal_sector and goal in start_distance:
+                    found.append((goal, start_distance[goal]))
+            else:
+                found = list(self.intra_edges(self.sector_of(node)).get(node, ()))
+                if node in goal_distance:
+                    found.append((goal, goal_distance[node]))
+            found.extend((partner, 1) for partner in self.partners.get(node, ()))
+            return found
+
+        g_score = {start: 0}
+        came_from = {start: None}
+        closed = set()
+        counter = 0
+        frontier = [(0, counter, start)]
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node in closed:
+                continue
+            closed.add(node)
+
+            if node == goal:
+                hops = []
+                while node != start:
+                    hops.append(node)
+                    node = came_from[node]
+                hops.reverse()
+                return g_score[goal], hops, start_parent
+
+            self.stats.nodes_expanded += 1
+            for other, cost in links(node):
+                next_g = g_score[node] + cost
+                if other in closed or next_g >= g_score.get(other, next_g + 1):
+                    continue
+                g_score[other] = next_g
+                came_from[other] = node
+                row, col = divmod(other, self.cols)
+                counter += 1
+                heapq.heappush(frontier, (next_g + abs(row - goal_row) + abs(col - goal_col), counter, other))
+        return None
+
+    def plan(self, start, goal):
+        """
+        search() from start, or from the best free neighbor of a start inside a wall (ghost mode):
+        (distance, first, hops, start_parent) or None.
+        """
+        if self.env.walkable[start]:
+            result = self.search(start, goal)
+            return None if result is None else (result[0], start) + result[1:]
+
+        best = None
+        for neighbor in self.env.free_neighbors(start).tolist():
+            result = self.search(neighbor, goal)
+            if result is not None and (best is None or result[0] + 1 < best[0]):
+                best = (result[0] + 1, neighbor) + result[1:]
+        return best
+
+    def tree_distance(self, start, goal):
+        """
+        search() distance from a free start to goal, from an A* grown backwards from goal. Settled
+        distances stay exact when start moves, so the tree is kept per goal and only grown as needed.
+        """
+        if start == goal:
+            return 0
+        tree = self.goal_trees.get(goal)
+        if tree is None:
+            if len(self.goal_trees) >= MAX_GOAL_TREES:
+                self.goal_trees = {}
+            goal_distance, _ = self.endpoint_search(goal)
+            frontier = [(0, goal_distance[node], node) for node in self.sector_nodes[self.sector_of(goal)]
+                        if node in goal_distance]
+            tree = self.goal_trees[goal] = [{}, frontier, None]
+        settled, frontier, aim = tree
+
+        start_row, start_col = divmod(start, self.cols)
+        if aim != start:
+            # Frontier ordered for this start: (g + Manhattan distance to it, g, node)
+            frontier = [(g + abs(node // self.cols - start_row) + abs(node % self.cols - start_col), g, node)
+                        for _, g, node in frontier]
+            heapq.heapify(frontier)
+            tree[1], tree[2] = frontier, start
+
+        start_distance, _ = self.endpoint_search(start)
+        start_sector = self.sector_of(start)
+        best = start_distance.get(goal, float('inf')) if start_sector == self.sector_of(goal) else float('inf')
+        exits = {node: start_distance[node] for node in self.sector_nodes[start_sector] if node in start_distance}
+        for node, cost in exits.items():
+            if node in settled:
+                best = min(best, cost + settled[node])
+
+        while frontier and frontier[0][0] < best:
+            _, distance, node = heapq.heappop(frontier)
+            if node in settled:
+                continue
+            settled[node] = distance
+            if node in exits:
+                best = min(best, exits[node] + distance)
+
+            self.stats.nodes_expanded += 1
+            links = list(self.intra_edges(self.sector_of(node)).get(node, ()))
+            links.extend((partner, 1) for partner in self.partners.get(node, ()))
+            for other, cost in links:
+                if other not in settled:
+                    row, col = divmod(other, self.cols)
+                    heapq.heappush(frontier, (distance + cost + abs(row - start_row) + abs(col - start_col),
+                                              distance + cost, other))
+        return best
+
+    def distance(self, start, goal):
+        """Approximate path distance between two positions (the same as search()), or infinity."""
+        if start == goal:
+            return 0
+        self.sync_walls()
+        start_cell, goal_cell = start[0] * self.cols + start[1], goal[0] * self.cols + goal[1]
+        if not self.env.walkable[goal_cell]:
+            return float('inf')
+        if self.env.walkable[start_cell]:
+            return self.tree_distance(start_cell, goal_cell)
+        # Start inside a wall (ghost mode): first step out to a free neighbor, like plan()
+        return min((self.tree_distance(neighbor, goal_cell) + 1
+                    for neighbor in self.env.free_neighbors(start_cell).tolist()), default=float('inf'))
+
+    def next_step(self, start, goal):
+        """Direction of the first move towards goal, or None."""
+        if start == goal:
+            return None
+        self.sync_walls()
+        start_cell = start[0] * self.cols + start[1]
+        result = self.plan(start_cell, goal[0] * self.cols + goal[1])
+        if result is None:
+            return None
+
+        _, first, hops, start_parent = result
+        if first == start_cell:
+            # Cell after start on the way to the first hop (a partner across the border is next to it)
+            first = hops[0]
+            while first in start_parent and start_parent[first] != start_cell:
+                first = start_parent[first]
+        return self.step_direction[first - start_cell]
+
+    def find_path(self, start, goal):
+        """Full refined path as a list of directions (like AStar.find_path), or None."""
+        if start == goal:
+            return []
+        self.sync_walls()
+        start_cell = start[0] * self.cols + start[1]
+        result = self.plan(start_cell, goal[0] * self.cols + goal[1])
+        if result is None:
+            return None
+
+        _, first, hops, start_parent = result
+        cells = [start_cell] if first == start_cell else [start_cell, first]
+        for hop in hops:
+            current = cells[-1]
+            if current == first:
+                segment = []
+                cell = hop
+                while cell in start_parent and cell != first:
+                    segment.append(cell)
+                    cell = start_parent[cell]
+                segment.reverse()
+                cells.extend(segment if segment else [hop])
+            elif hop in self.partners.get(current, ()) and self.sector_of(hop) != self.sector_of(current):
+                cells.append(hop)
+            else:
+                # Same sector: walk the hop's in-sector search tree back from current
+                _, parent = self.sector_search(hop, self.sector_of(current))
+                cell = parent[current]
+                while cell != -1:
+                    cells.append(cell)
+                    cell = parent[cell]
+
+        return [self.step_direction[b - a] for a, b in zip(cells, cells[1:])]
@@ -0,0 +1,187 @@
+import heapq
+import numpy as np
+from array import array
+from algorithms.astar import AStar
+
+
+class JumpPointSearch(AStar):
+    """
+    Jump Point Search for the 4-connected grid (pathfinding.js "never move diagonally" rules),
+    same path lengths as AStar; nodes_expanded counts jump points. Cells are in a padded index
+    space (a wall ring, no bounds checks) and horizontal scans are table lookups (build_stops).
+    """
+
+    def __init__(self, env):
+        super().__init__(env)
+        self.width = env.cols + 2
+        self.offset_direction = {-self.width: "up", self.width: "down", -1: "left", 1: "right"}
+
+        padded = np.ones((env.rows + 2, env.cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = env.grid == 0
+        self.walkable = bytearray(padded.tobytes())
+        self.synced_jump_walls = len(env.wall_changes)
+
+        cells = len(self.walkable)
+        self.right_stop = array("i", bytes(4 * cells))
+        self.left_stop = array("i", bytes(4 * cells))
+        self.build_stops(1, env.rows)
+
+        self.jump_g = [0] * cells
+        self.jump_parent = [0] * cells
+        self.jump_seen = [0] * cells
+        self.jump_closed = [0] * cells
+
+    def sync_jump_walls(self):
+        wall_changes = self.env.wall_changes
+        while self.synced_jump_walls < len(wall_changes):
+            row, col = wall_changes[self.synced_jump_walls]
+            self.synced_jump_walls += 1
+            self.walkable[(row + 1) * self.width + col + 1] = self.env.walkable[row * self.env.cols + col]
+            # Forced neighbors depend on the rows above and below
+            self.build_stops(max(row, 1), min(row + 2, self.env.rows))
+
+    def build_stops(self, first, last):
+        """
+        right_stop / left_stop[cell]: first cell from cell (included) going right / left that is a wall
+        or has a forced neighbor, for the padded rows first..last.
+        """
+        width = self.width
+        walkable = np.frombuffer(self.walkable, dtype=np.uint8).reshape(-1, width) == 1
+        up, here, down = walkable[first - 1:last], walkable[first:last + 1], walkable[first + 1:last + 2]
+
+        forced_right = np.zeros_like(here)
+        forced_right[:, 1:] = (up[:, 1:] & ~up[:, :-1]) | (down[:, 1:] & ~down[:, :-1])
+        forced_left = np.zeros_like(here)
+        forced_left[:, :-1] = (up[:, :-1] & ~up[:, 1:]) | (down[:, :-1] & ~down[:, 1:])
+
+        ids = np.arange(first * width, (last + 1) * width, dtype=np.int32).reshape(-1, width)
+        # The wall ring ends every row, so each scan meets a stop
+        right = np.where(~here | forced_right, ids, np.iinfo(np.int32).max)
+        right = np.minimum.accumulate(right[:, ::-1], axis=1)[:, ::-1]
+        left = np.maximum.accumulate(np.where(~here | forced_left, ids, -1), axis=1)
+
+        self.right_stop[first * width:(last + 1) * width] = array("i", right.astype(np.int32).tobytes())
+        self.left_stop[first * width:(last + 1) * width] = array("i", left.astype(np.int32).tobytes())
+
+    def jump_horizontal(self, cell, step, goal):
+        """First jump point from cell going left/right (step = -1/+1), or -1."""
+        if step == 1:
+            stop = self.right_stop[cell]
+            if cell <= goal <= stop:
+                return goal
+        else:
+            stop = self.left_stop[cell]
+            if stop <= goal <= cell:
+                return goal
+        return stop if self.walkable[stop] else -1
+
+    def jump_vertical(self, cell, step, goal):
+        """First jump point from cell going up/down (step = -width/+width), or -1."""
+        walkable, right_stop, left_stop = self.walkable, self.right_stop, self.left_stop
+        while walkable[cell]:
+            if cell == goal:
+                return cell
+            if ((walkable[cell - 1] and not walkable[cell - step - 1]) or
+                    (walkable[cell + 1] and not walkable[cell - step + 1])):
+                return cell
+            # Moving vertically, a horizontal jump point makes this cell one too
+            # (jump_horizontal from both sides of the cell, inlined)
+            right, left = right_stop[cell + 1], left_stop[cell - 1]
+            if walkable[right] or walkable[left] or left < goal < right:
+                return cell
+            cell += step
+        return -1
+
+    def find_path(self, start, goal):
+        if start == goal:
+            return []
+
+        self.sync_jump_walls()
+        width = self.width
+        walkable = self.walkable
+        start_cell = (start[0] + 1) * width + start[1] + 1
+        goal_cell = (goal[0] + 1) * width + goal[1] + 1
+
+        if not walkable[start_cell]:
+            return super().find_path(start, goal)  # Ghost mode start inside a wall
+        if not walkable[goal_cell]:
+            return None
+        goal_row, goal_col = divmod(goal_cell, width)
+
+        self.search_id += 1
+        stamp = self.search_id
+        g_score, parent, seen, closed = self.jump_g, self.jump_parent, self.jump_seen, self.jump_closed
+
+        g_score[start_cell] = 0
+        parent[start_cell] = -1
+        seen[start_cell] = stamp
+
+        counter = 0
+        frontier = [(0, counter, start_cell)]
+
+        while frontier:
+            _, _, current = heapq.heappop(frontier)
+
+            if closed[current] == stamp:
+                continue
+            closed[current] = stamp
+
+            if current == goal_cell:
+                return self.reconstruct_jump_path(current)
+
+            self.stats.nodes_expanded += 1
+
+            # Pruned directions: straight on and both sides of the arrival direction
+            if parent[current] == -1:
+                steps = (-width, width, -1, 1)
+            else:
+                delta = current - parent[current]
+                if abs(delta) < width:
+                    forward = 1 if delta > 0 else -1
+                    steps = (-width, width, forward)
+                else:
+                    forward = width if delta > 0 else -width
+                    steps = (-1, 1, forward)
+
+            current_g = g_score[current]
+            current_row, current_col = divmod(current, width)
+            for step in steps:
+                if not walkable[current + step]:
+                    continue
+                if step == 1 or step == -1:
+                    jump_point = self.jump_horizontal(current + step, step, goal_cell)
+                else:
+                    jump_point = self.jump_vertical(current + step, step, goal_cell)
+                if jump_point == -1 or closed[jump_point] == stamp:
+                    continue
+
+                row, col = divmod(jump_point, width)
+                next_g = current_g + abs(row - current_row) + abs(col - current_col)
+                if seen[jump_point] == stamp and next_g >= g_score[jump_point]:
+                    continue
+
+                seen[jump_point] = stamp
+                g_score[jump_point] = next_g
+                parent[jump_point] = current
+
+                f_score = next_g + abs(row - goal_row) + abs(col - goal_col)
+                counter += 1
+                heapq.heappush(frontier, (f_score, counter, jump_point))
+
+        return None
+
+    def reconstruct_jump_path(self, cell):
+        """Expand the straight segments between jump points into single moves."""
+        path = []
+        parent, width = self.jump_parent, self.width
+        while parent[cell] != -1:
+            previous = parent[cell]
+            delta = cell - previous
+            if abs(delta) < width:
+                step, length = (1 if delta > 0 else -1), abs(delta)
+            else:
+                step, length = (width if delta > 0 else -width), abs(delta) // width
+            path.extend([self.offset_direction[step]] * length)
+            cell = previous
+        path.reverse()
+        return path
@@ -1,59 +1,206 @@
+import math
+import time
+import numpy as np
+from algorithms.bitboard import Bitboard
+from algorithms.distance_oracle import DistanceOracle
+from algorithms.hpa import HierarchicalPathfinder
+from algorithms.parallel_search import get_pool, score_root_action
+from algorithms.power_up_fields import PowerUpFields
+from algorithms.search_stats import SearchStats
+from algorithms.transposition import ZobristHasher, TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from environment.grid import POWER_UP_TYPES, UNREACHABLE
+from game.state import GameBoard, GameState, RUNNER, GHOST, WALL, STAY, describe_action
+
+
+MAX_ITERATIVE_DEPTH = 64
+POWER_UP_RANGE = 3  # Power-ups further away than this never change the evaluation
+MAX_EVALUATION_CACHE = 200000
+
+# Full-state search (see state_alphabeta)
+CAPTURE_SCORE = -1000.0  # Minus the remaining depth, so faster captures score lower
+ITEM_VALUE = 0.25  # Per wall_builder/ghost_mode item held
+BOOST_VALUE = 0.25  # Per speed boost turn left
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move time budget is exhausted."""
+
+
 class Minimax:    
-    def __init__(self, env, max_depth):
+    def __init__(self, env, max_depth, use_alpha_beta=True, use_transposition_table=True, tt_memory_mb=8,
+                 use_distance_oracle=True, use_power_up_fields=True, time_budget_ms=None,
+                 parallel_workers=None, use_hierarchy=False, full_state=False, use_bitboard=True):
         self.env = env
-        self.max_depth = max_depth
+        self.max_depth = max_depth  # Fixed depth, or depth cap (None = no cap) with a time budget
         self.directions = ["up", "down", "left", "right"]
+        self.step_direction = {-env.cols: "up", env.cols: "down", -1: "left", 1: "right"}
+        
+        # Root actions searched in a process pool (fixed-depth searches only)
+        self.parallel_workers = parallel_workers
+        self.worker_options = {
+            "use_alpha_beta": use_alpha_beta,
+            "use_transposition_table": use_transposition_table,
+            "tt_memory_mb": tt_memory_mb,
+            "use_distance_oracle": use_distance_oracle,
+            "use_power_up_fields": use_power_up_fields,
+            "use_hierarchy": use_hierarchy,
+            "use_bitboard": use_bitboard,
+        }
+        
+        # Search GameStates (items, boosts, power-up pickups and walls inside the tree)
+        # instead of agent positions only; root parallelism is not used in this mode
+        self.full_state = full_state
+        
+        # Iterative deepening with a per-move time budget
+        self.time_budget_ms = time_budget_ms
+        self.deadline = None
+        self.completed_depth = 0
+        
+        # Alpha-beta search state
+        self.use_alpha_beta = use_alpha_beta
+        self.killer_moves = {}  # remaining depth -> direction that caused the last cutoff
+        self.history = {}  # (is_maximizing, destination) -> cutoff score
+        self.stats = SearchStats()  # Counters for the current move
+        
+        # Transposition table (only used by the alpha-beta search)
+        self.zobrist = ZobristHasher(env.rows, env.cols)
+        self.transposition_table = TranspositionTable(tt_memory_mb) if use_transposition_table else None
+        self.board_key = None
+        
+        # Kept between moves of the same game
+        self.evaluation_cache = {}  # (catcher_pos, runner_pos[, power-up mask]) -> value, for the current board_key
+        self.principal_variation = {}  # (catcher_pos, runner_pos, is_maximizing) -> expected move
+        
+        # All-pairs distance table, only for maps small enough to store it
+        self.distance_oracle = None
+        if use_distance_oracle and DistanceOracle.fits(env):
+            self.distance_oracle = DistanceOracle(env)
+        
+        # Approximate HPA* distances for maps too large for the oracle
+        self.hierarchy = None
+        if use_hierarchy and self.distance_oracle is None:
+            self.hierarchy = HierarchicalPathfinder(env)
+        
+        # Big-int flood fills: exact distances, and cheap with hypothetical walls
+        self.bitboard = None
+        if use_bitboard and Bitboard.fits(env):
+            self.bitboard = Bitboard(env)
+        
+        # Cached distance maps to every power-up for the evaluation
+        self.power_up_fields = None
+        if use_power_up_fields:
+            self.power_up_fields = PowerUpFields(env, clamp=POWER_UP_RANGE)
+            self.power_up_table = self.build_power_up_table()
     
-    def real_path_distance(self, start, goal):
+    def real_path_distance(self, start, goal, extra_walls=None):
         """
-        Calculate real path distance using A* (considers walls).
+        Calculate real path distance (considers walls).
+        extra_walls: hypothetical walls to consider on top of env.grid (never written to it).
         Returns number of moves needed, or infinity if no path.
         """
-        import heapq
+        stats = self.stats
+        stats.distance_calls += 1
+        start_time = time.perf_counter()
+        
+        if self.distance_oracle is not None and not extra_walls:
+            distance = self.distance_oracle.distance(start, goal)
+        elif self.hierarchy is not None and not extra_walls:
+            distance = self.hierarchy.distance(start, goal)
+        elif self.bitboard is not None:
+            distance = self.bitboard.distance(start, goal, extra_walls)
+        else:
+            distance = self.field_distance(start, goal, extra_walls)
         
+        stats.distance_time += time.perf_counter() - start_time
+        return distance
+    
+    @property
+    def nodes_pruned(self):
+        return self.stats.nodes_pruned
+    
+    def field_distance(self, start, goal, extra_walls=None):
+        """
+        Calculate real path distance from the environment's distance field of goal
+        (cached there, so searches that keep the same goal reuse it).
+        Returns number of moves needed, or infinity if no path.
+        """
         if start == goal:
             return 0
+        if not self.is_position_valid(goal) or (extra_walls and goal in extra_walls):
+            return float('inf')
+        
+        field = self.env.distance_field(goal, extra_blocked=extra_walls)
+        distance = field[start]
+        if distance == UNREACHABLE:
+            # Start inside a wall (ghost mode): first step out to a free neighbor
+            neighbors = [field[new_pos] for _, new_pos in self.get_valid_moves(start)
+                         if not (extra_walls and new_pos in extra_walls)]
+            distance = min(neighbors, default=UNREACHABLE) + 1
+        
+        return float('inf') if distance >= UNREACHABLE else int(distance)
+    
+    def power_up_term(self, power_type, runner_dist, catcher_dist, distance_score):
+        """Contribution of a single power-up to the evaluation (positive favors the Runner)."""
+        powerup_bonus = 0
         
-        def heuristic(pos):
-            # Manhattan distance as heuristic
-            return abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
-        
-        # Priority queue: (f_score, g_score, position)
-        open_set = [(heuristic(start), 0, start)]
-        visited = {start: 0}  # position -> g_score
-        
-        while open_set:
-            f_score, g_score, pos = heapq.heappop(open_set)
-            
-            # If we reached the goal
-            if pos == goal:
-                return g_score
-            
-            # If we found a better path to this position, skip
-            if g_score > visited.get(pos, float('inf')):
-                continue
-            
-            # Explore neighbors
-            for direction in self.directions:
-                new_pos = self.get_new_position(pos, direction)
-                if new_pos and self.is_position_valid(new_pos):
-                    new_g_score = g_score + 1
-                    
-                    # If this is a better path
-                    if new_g_score < visited.get(new_pos, float('inf')):
-                        visited[new_pos] = new_g_score
-                        new_f_score = new_g_score + heuristic(new_pos)
-                        heapq.heappush(open_set, (new_f_score, new_g_score, new_pos))
-        
-        return float('inf')  # No path found
+        if power_type == "speed_boost":
+            if runner_dist <= 2:
+                powerup_bonus += (3 - runner_dist) * 0.05
+            if catcher_dist <= 2:
+                powerup_bonus -= (3 - catcher_dist) * 0.05
+
+        elif power_type == "wall_builder":
+            if runner_dist < catcher_dist and runner_dist <= 2:
+                powerup_bonus += 0.1
+            elif catcher_dist <= 2:
+                powerup_bonus -= 0.05
+        
+        elif power_type == "ghost_mode":
+            if runner_dist < catcher_dist and runner_dist <= 2:
+                powerup_bonus += 0.08
+            elif catcher_dist <= 2:
+                powerup_bonus -= 0.1
+        
+        elif power_type == "teleport":
+            if distance_score <= 3 and runner_dist <= 1:
+                powerup_bonus += 0.15
+            elif runner_dist < catcher_dist and runner_dist <= 2:
+                powerup_bonus += 0.08
+            elif catcher_dist <= 1:
+                powerup_bonus -= 0.08
+        
+        return powerup_bonus
+    
+    def build_power_up_table(self):
+        """
+        power_up_term only compares distances against 0..2, so clamped distances fit in a table
+        indexed by [type, runner_dist, catcher_dist, distance_score <= 3].
+        """
+        size = POWER_UP_RANGE + 1
+        table = np.zeros((len(POWER_UP_TYPES), size, size, 2))
+        for t, power_type in enumerate(POWER_UP_TYPES):
+            for runner_dist in range(size):
+                for catcher_dist in range(size):
+                    table[t, runner_dist, catcher_dist, 0] = self.power_up_term(power_type, runner_dist, catcher_dist, 4)
+                    table[t, runner_dist, catcher_dist, 1] = self.power_up_term(power_type, runner_dist, catcher_dist, 3)
+        return table
     
-    def evaluate_position(self, catcher_pos, runner_pos):
+    def evaluate_position(self, catcher_pos, runner_pos, power_ups=None):
+        """power_ups: bitmask of the env.power_ups still on the map (GameState.power_ups), None for all."""
+        self.stats.leaf_evaluations += 1
+        
+        cache_key = (catcher_pos, runner_pos) if power_ups is None else (catcher_pos, runner_pos, power_ups)
+        cached = self.evaluation_cache.get(cache_key)
+        if cached is not None:
+            self.stats.cache_hits += 1
+            return cached
         
         distance_score = self.real_path_distance(catcher_pos, runner_pos)
         
         # Mobility evaluation - penalize positions with few escape routes
-        runner_moves = len(self.get_valid_moves(runner_pos))
-        catcher_moves = len(self.get_valid_moves(catcher_pos))
+        neighbor_count, cols = self.env.neighbor_count, self.env.cols
+        runner_moves = neighbor_count[runner_pos[0] * cols + runner_pos[1]]
+        catcher_moves = neighbor_count[catcher_pos[0] * cols + catcher_pos[1]]
         
         # Runner wants more mobility (escape options), Catcher wants to restrict it
         mobility_score = (runner_moves - catcher_moves) * 0.5
@@ -65,48 +212,39 @@ class Minimax:
         # Power-up evaluation with MUCH lower weights to avoid distractions
         powerup_bonus = 0
         
-        for pos, power_type in self.env.power_ups.items():
-            runner_dist = self.real_path_distance(runner_pos, pos)
-            catcher_dist = self.real_path_distance(catcher_pos, pos)
-            
-            if power_type == "speed_boost":
-                if runner_dist <= 2:
-                    powerup_bonus += (3 - runner_dist) * 0.05
-                if catcher_dist <= 2:
-                    powerup_bonus -= (3 - catcher_dist) * 0.05
-
-            elif power_type == "wall_builder":
-                if runner_dist < catcher_dist and runner_dist <= 2:
-                    powerup_bonus += 0.1
-                elif catcher_dist <= 2:
-                    powerup_bonus -= 0.05
-            
-            elif power_type == "ghost_mode":
-                if runner_dist < catcher_dist and runner_dist <= 2:
-                    powerup_bonus += 0.08
-                elif catcher_dist <= 2:
-                    powerup_bonus -= 0.1
-            
-            elif power_type == "teleport":
-                if distance_score <= 3 and runner_dist <= 1:
-                    powerup_bonus += 0.15
-                elif runner_dist < catcher_dist and runner_dist <= 2:
-                    powerup_bonus += 0.08
-                elif catcher_dist <= 1:
-                    powerup_bonus -= 0.08
+        if self.power_up_fields is not None:
+            # Vectorized lookup for all power-ups at once
+            fields = self.power_up_fields
+            fields.sync()
+            if len(fields.types):
+                cols = self.env.cols
+                present = slice(None)
+                if power_ups is not None:
+                    present = [i for i in range(len(fields.types)) if power_ups >> i & 1]
+                runner_dist = fields.fields[present, runner_pos[0] * cols + runner_pos[1]]
+                catcher_dist = fields.fields[present, catcher_pos[0] * cols + catcher_pos[1]]
+                close = 1 if distance_score <= 3 else 0
+                powerup_bonus = float(self.power_up_table[fields.types[present], runner_dist, catcher_dist, close].sum())
+        else:
+            for i, (pos, power_type) in enumerate(self.env.power_ups.items()):
+                if power_ups is not None and not power_ups >> i & 1:
+                    continue
+                runner_dist = self.real_path_distance(runner_pos, pos)
+                catcher_dist = self.real_path_distance(catcher_pos, pos)
+                powerup_bonus += self.power_up_term(power_type, runner_dist, catcher_dist, distance_score)
         
         # Cap power-up bonus to prevent overwhelming distance
         powerup_bonus = max(-0.5, min(0.5, powerup_bonus))
         
-        return distance_score + mobility_score + powerup_bonus
+        value = distance_score + mobility_score + powerup_bonus
+        self.evaluation_cache[cache_key] = value
+        return value
     
     def get_valid_moves(self, pos):
-        valid_moves = []
-        for direction in self.directions:
-            new_pos = self.get_new_position(pos, direction)
-            if new_pos and self.is_position_valid(new_pos):
-                valid_moves.append((direction, new_pos))
-        return valid_moves
+        cols = self.env.cols
+        cell = pos[0] * cols + pos[1]
+        return [(self.step_direction[neighbor - cell], divmod(neighbor, cols))
+                for neighbor in self.env.free_neighbors(cell)]
     
     def get_new_position(self, pos, direction):
         row, col = pos
@@ -123,25 +261,28 @@ class Minimax:
     def is_position_valid(self, pos):
         row, col = pos
         if 0 <= row < self.env.rows and 0 <= col < self.env.cols:
-            if self.env.grid[row, col] == 1:  # Se c'è un muro (1), non è valido
-                return False
-            if pos in self.env.temporary_walls:
-                return False
-            return True
+            # Temporary walls are in the grid too, so walkable covers them
+            return self.env.walkable[row * self.env.cols + col] == 1
         return False
     
     def check_if_trapped(self, runner_pos, catcher_pos, wall_pos):
+        if self.bitboard is not None:
+            # Only "within 5 moves" matters: the flood fill stops after 5 layers
+            stats = self.stats
+            stats.distance_calls += 1
+            start_time = time.perf_counter()
+            reached = self.bitboard.within(catcher_pos, 5, extra_walls={wall_pos})
+            stats.distance_time += time.perf_counter() - start_time
+            return bool(reached & self.bitboard.bit(runner_pos))
 
-        original_grid_value = self.env.grid[wall_pos]
-        self.env.grid[wall_pos] = 1
-        
-        distance_with_wall = self.real_path_distance(catcher_pos, runner_pos)
-        
-        self.env.grid[wall_pos] = original_grid_value
+        distance_with_wall = self.real_path_distance(catcher_pos, runner_pos, extra_walls={wall_pos})
         
         return distance_with_wall <= 5
     
     def minimax(self, catcher_pos, runner_pos, depth, is_maximizing):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        
         if depth == 0 or catcher_pos == runner_pos:
             return self.evaluate_position(catcher_pos, runner_pos)
         
@@ -152,6 +293,7 @@ class Minimax:
             if not valid_moves:
                 return self.evaluate_position(catcher_pos, runner_pos)
             
+            self.stats.nodes_expanded += 1
             for direction, new_runner_pos in valid_moves:
                 eval_score = self.minimax(catcher_pos, new_runner_pos, depth - 1, False)
                 max_eval = max(max_eval, eval_score)
@@ -164,13 +306,498 @@ class Minimax:
             if not valid_moves:
                 return self.evaluate_position(catcher_pos, runner_pos)
             
+            self.stats.nodes_expanded += 1
             for direction, new_catcher_pos in valid_moves:
                 eval_score = self.minimax(new_catcher_pos, runner_pos, depth - 1, True)
                 min_eval = min(min_eval, eval_score)
             
             return min_eval
     
-    def get_best_action_catcher(self, catcher_pos, runner_pos, catcher_agent):
+    def order_moves(self, valid_moves, opponent_pos, depth, is_maximizing, hash_move=None):
+        """
+        Sort moves so the most promising ones are searched first.
+        Transposition table move first, then killer move, then history score,
+        then distance to the opponent (Runner tries to get away, Catcher tries to get closer).
+        """
+        killer = self.killer_moves.get(depth)
+        
+        def move_key(move):
+            direction, new_pos = move
+            distance = abs(new_pos[0] - opponent_pos[0]) + abs(new_pos[1] - opponent_pos[1])
+            return (
+                direction != hash_move,
+                direction != killer,
+                -self.history.get((is_maximizing, new_pos), 0),
+                -distance if is_maximizing else distance,
+            )
+        
+        return sorted(valid_moves, key=move_key)
+    
+    def record_cutoff(self, depth, is_maximizing, direction, new_pos):
+        self.killer_moves[depth] = direction
+        key = (is_maximizing, new_pos)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+    
+    def alphabeta(self, catcher_pos, runner_pos, depth, alpha, beta, is_maximizing, key=None):
+        """
+        Fail-soft alpha-beta version of minimax: returns the same value whenever
+        it lies inside (alpha, beta), otherwise a bound on the correct side.
+        key is the Zobrist hash of the node, updated incrementally from the parent.
+        """
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        
+        if depth == 0 or catcher_pos == runner_pos:
+            return self.evaluate_position(catcher_pos, runner_pos)
+        
+        table = self.transposition_table
+        hash_move = None
+        if table is not None:
+            if key is None:
+                key = self.zobrist.state_hash(self.board_key, catcher_pos, runner_pos, is_maximizing)
+            
+            entry = table.probe(key)
+            if entry is not None:
+                self.stats.cache_hits += 1
+                _, entry_depth, entry_value, bound, hash_move, _ = entry
+                # Only entries searched to exactly this depth give cutoffs, so the value
+                # does not depend on search order (serial, parallel and iterative
+                # deepening all agree); other depths still provide the hash move
+                if entry_depth == depth:
+                    if bound == EXACT:
+                        return entry_value
+                    if bound == LOWER_BOUND:
+                        alpha = max(alpha, entry_value)
+                    else:
+                        beta = min(beta, entry_value)
+                    if alpha >= beta:
+                        self.stats.cutoffs += 1
+                        return entry_value
+        
+        window_alpha, window_beta = alpha, beta
+        zobrist = self.zobrist
+        best_move = None
+        
+        if is_maximizing:
+            valid_moves = self.get_valid_moves(runner_pos)
+            
+            if not valid_moves:
+                return self.evaluate_position(catcher_pos, runner_pos)
+            
+            self.stats.nodes_expanded += 1
+            valid_moves = self.order_moves(valid_moves, catcher_pos, depth, True, hash_move)
+            best_value = float('-inf')
+            
+            for i, (direction, new_runner_pos) in enumerate(valid_moves):
+                child_key = None
+                if key is not None:
+                    child_key = (key ^ zobrist.side_key
+                                 ^ zobrist.runner_keys[zobrist.cell_index(runner_pos)]
+                                 ^ zobrist.runner_keys[zobrist.cell_index(new_runner_pos)])
+                
+                eval_score = self.alphabeta(catcher_pos, new_runner_pos, depth - 1, alpha, beta, False, child_key)
+                if eval_score > best_value:
+                    best_value = eval_score
+                    best_move = direction
+                alpha = max(alpha, eval_score)
+                
+                if alpha >= beta:
+                    self.record_cutoff(depth, True, direction, new_runner_pos)
+                    self.stats.cutoffs += 1
+                    self.stats.nodes_pruned += len(valid_moves) - i - 1
+                    break
+        else:
+            valid_moves = self.get_valid_moves(catcher_pos)
+            
+            if not valid_moves:
+                return self.evaluate_position(catcher_pos, runner_pos)
+            
+            self.stats.nodes_expanded += 1
+            valid_moves = self.order_moves(valid_moves, runner_pos, depth, False, hash_move)
+            best_value = float('inf')
+            
+            for i, (direction, new_catcher_pos) in enumerate(valid_moves):
+                child_key = None
+                if key is not None:
+                    child_key = (key ^ zobrist.side_key
+                                 ^ zobrist.catcher_keys[zobrist.cell_index(catcher_pos)]
+                                 ^ zobrist.catcher_keys[zobrist.cell_index(new_catcher_pos)])
+                
+                eval_score = self.alphabeta(new_catcher_pos, runner_pos, depth - 1, alpha, beta, True, child_key)
+                if eval_score < best_value:
+                    best_value = eval_score
+                    best_move = direction
+                beta = min(beta, eval_score)
+                
+                if alpha >= beta:
+                    self.record_cutoff(depth, False, direction, new_catcher_pos)
+                    self.stats.cutoffs += 1
+                    self.stats.nodes_pruned += len(valid_moves) - i - 1
+                    break
+        
+        if table is not None:
+            if best_value <= window_alpha:
+                bound = UPPER_BOUND
+            elif best_value >= window_beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            table.store(key, depth, best_value, bound, best_move)
+        
+        return best_value
+    
+    def search(self, catcher_pos, runner_pos, depth, is_maximizing, alpha=float('-inf'), beta=float('inf')):
+        if self.use_alpha_beta:
+            return self.alphabeta(catcher_pos, runner_pos, depth, alpha, beta, is_maximizing)
+        return self.minimax(catcher_pos, runner_pos, depth, is_maximizing)
+    
+    def evaluate_state(self, state):
+        """evaluate_position plus the walls placed in the search, items and boosts."""
+        catcher_pos, runner_pos = state.positions()
+        # Only the power-ups not collected inside the search tree
+        every_power_up = (1 << len(state.board.power_up_cells)) - 1
+        value = self.evaluate_position(catcher_pos, runner_pos,
+                                       None if state.power_ups == every_power_up else state.power_ups)
+        
+        if state.walls:
+            # Swap the distance term for the distance around the placed walls
+            cols = self.env.cols
+            distance = self.real_path_distance(catcher_pos, runner_pos)
+            if distance != float('inf'):
+                walls = {divmod(cell, cols) for cell in state.walls}
+                value += self.real_path_distance(catcher_pos, runner_pos, extra_walls=walls) - distance
+        
+        items = state.runner_walls + state.runner_ghosts - state.catcher_walls - state.catcher_ghosts
+        return value + ITEM_VALUE * items + BOOST_VALUE * (state.runner_boost - state.catcher_boost)
+    
+    def state_alphabeta(self, state, depth, alpha, beta):
+        """
+        Fail-soft alpha-beta over GameState.apply/undo: one ply is one move (a boosted side moves
+        twice in a row) and a capture ends the line.
+        """
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        
+        if state.captured():
+            return CAPTURE_SCORE - depth
+        if depth == 0:
+            return self.evaluate_state(state)
+        
+        table = self.transposition_table
+        actions = state.legal_actions()
+        key = state.key ^ self.board_key
+        if table is not None:
+            entry = table.probe(key)
+            if entry is not None:
+                self.stats.cache_hits += 1
+                _, entry_depth, entry_value, bound, hash_move, _ = entry
+                if entry_depth == depth:
+                    if bound == EXACT:
+                        return entry_value
+                    if bound == LOWER_BOUND:
+                        alpha = max(alpha, entry_value)
+                    else:
+                        beta = min(beta, entry_value)
+                    if alpha >= beta:
+                        self.stats.cutoffs += 1
+                        return entry_value
+                if hash_move in actions:
+                    actions.remove(hash_move)
+                    actions.insert(0, hash_move)
+        
+        self.stats.nodes_expanded += 1
+        window_alpha, window_beta = alpha, beta
+        is_maximizing = state.side == RUNNER
+        best_value = float('-inf') if is_maximizing else float('inf')
+        best_move = None
+        
+        for i, action in enumerate(actions):
+            state.apply(action)
+            eval_score = self.state_alphabeta(state, depth - 1, alpha, beta)
+            state.undo()
+            
+            if is_maximizing:
+                if eval_score > best_value:
+                    best_value = eval_score
+                    best_move = action
+                alpha = max(alpha, eval_score)
+            else:
+                if eval_score < best_value:
+                    best_value = eval_score
+                    best_move = action
+                beta = min(beta, eval_score)
+            
+            if alpha >= beta:
+                self.stats.cutoffs += 1
+                self.stats.nodes_pruned += len(actions) - i - 1
+                break
+        
+        if table is not None:
+            if best_value <= window_alpha:
+                bound = UPPER_BOUND
+            elif best_value >= window_beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            table.store(key, depth, best_value, bound, best_move)
+        
+        return best_value
+    
+    def search_state_root(self, state, actions, depth, order):
+        """search_root for a GameState: best action code, ties keep the earlier action."""
+        is_maximizing = state.side == RUNNER
+        best_index = None
+        best_value = float('-inf') if is_maximizing else float('inf')
+        
+        for i in order:
+            bound = best_value
+            if best_index is not None and i < best_index:
+                bound = math.nextafter(best_value, float('-inf') if is_maximizing else float('inf'))
+            
+            state.apply(actions[i])
+            if is_maximizing:
+                move_value = self.state_alphabeta(state, depth - 1, bound, float('inf'))
+                better = move_value > bound
+            else:
+                move_value = self.state_alphabeta(state, depth - 1, float('-inf'), bound)
+                better = move_value < bound
+            state.undo()
+            
+            if better:
+                best_value = move_value
+                best_index = i
+        
+        return actions[best_index] if best_index is not None else None
+    
+    def get_best_state_action(self, catcher_pos, runner_pos, catcher_agent, runner_agent, is_catcher):
+        """Full-state search from the current position; same result format as get_best_action_*."""
+        board = GameBoard(self.env, zobrist=self.zobrist)
+        state = GameState.from_env(self.env, catcher_agent, runner_agent, catcher_to_move=is_catcher,
+                                   board=board, positions=(catcher_pos, runner_pos))
+        actions = state.legal_actions()
+        order = list(range(len(actions)))
+        
+        if self.time_budget_ms is None:
+            best_action = self.search_state_root(state, actions, self.max_depth, order)
+            self.completed_depth = self.max_depth
+        else:
+            deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+            best_action = None
+            try:
+                for depth in range(1, (self.max_depth or MAX_ITERATIVE_DEPTH) + 1):
+                    action = self.search_state_root(state, actions, depth, order)
+                    if action is not None:
+                        best_action = action
+                        best_index = actions.index(action)
+                        order = [best_index] + [i for i in order if i != best_index]
+                    
+                    self.completed_depth = depth
+                    self.deadline = deadline
+                    if time.perf_counter() >= deadline:
+                        break
+            except SearchTimeout:
+                pass
+            finally:
+                self.deadline = None
+        
+        if best_action is None or best_action == STAY:
+            return ("move", None, None)
+        kind, direction = describe_action(best_action)
+        if kind == WALL:
+            return ("move", None, self.get_new_position(catcher_pos if is_catcher else runner_pos, direction))
+        if kind == GHOST:
+            return ("use_ghost", direction, None)
+        return ("move", direction, None)
+    
+    def reset_search(self):
+        """
+        Start a new move, keeping tables, killer moves, history and evaluations: entries are keyed by
+        the full board hash, and the new generation lets stale ones be overwritten first.
+        """
+        self.stats.reset()
+        self.completed_depth = 0
+        
+        # Old history scores fade out instead of being dropped
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+        
+        # Walls and power-ups may have changed since the last move
+        board_key = self.zobrist.board_hash(self.env)
+        if board_key != self.board_key:
+            self.board_key = board_key
+            self.evaluation_cache = {}
+        elif len(self.evaluation_cache) > MAX_EVALUATION_CACHE:
+            self.evaluation_cache = {}
+        
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+    
+    def root_hint(self, catcher_pos, runner_pos, is_catcher):
+        """
+        Best root move from earlier searches: the previous principal variation if the game
+        followed it, else the hash move stored for this position.
+        """
+        state = (catcher_pos, runner_pos, not is_catcher)
+        if state in self.principal_variation:
+            return self.principal_variation[state]
+        
+        if self.transposition_table is not None:
+            key = self.zobrist.state_hash(self.board_key, catcher_pos, runner_pos, not is_catcher)
+            entry = self.transposition_table.probe(key)
+            if entry is not None:
+                return entry[4]
+        return None
+    
+    def extract_principal_variation(self, catcher_pos, runner_pos, is_maximizing, max_length):
+        """Follow the hash moves from a position: {(catcher_pos, runner_pos, is_maximizing): direction}."""
+        variation = {}
+        if self.transposition_table is None:
+            return variation
+        
+        for _ in range(max_length):
+            state = (catcher_pos, runner_pos, is_maximizing)
+            key = self.zobrist.state_hash(self.board_key, catcher_pos, runner_pos, is_maximizing)
+            entry = self.transposition_table.probe(key)
+            if entry is None or entry[4] is None or state in variation:
+                break
+            
+            direction = entry[4]
+            variation[state] = direction
+            if is_maximizing:
+                runner_pos = self.get_new_position(runner_pos, direction)
+            else:
+                catcher_pos = self.get_new_position(catcher_pos, direction)
+            is_maximizing = not is_maximizing
+        
+        return variation
+    
+    def search_root(self, actions, catcher_pos, runner_pos, depth, is_catcher, order=None):
+        """
+        Best root action, each scored with a search of the given depth (Catcher minimizes, Runner maximizes).
+        order is the search order (best guess first); ties keep the earlier action in the list.
+        """
+        if order is None:
+            order = range(len(actions))
+        
+        if self.parallel_workers and self.time_budget_ms is None and len(actions) > 1:
+            return self.search_root_parallel(actions, catcher_pos, runner_pos, depth, is_catcher)
+        
+        best_index = None
+        
+        if is_catcher:
+            best_value = float('inf')
+            for i in order:
+                new_pos = actions[i][2]
+                # Only a value below best_value can change the choice, so it is the upper bound;
+                # an action listed earlier than the current best also wins ties
+                bound = best_value
+                if best_index is not None and i < best_index:
+                    bound = math.nextafter(best_value, float('inf'))
+                move_value = self.search(new_pos, runner_pos, depth - 1, True, beta=bound)
+                
+                if move_value < bound:
+                    best_value = move_value
+                    best_index = i
+        else:
+            best_value = float('-inf')
+            for i in order:
+                new_pos = actions[i][2]
+                # Only a value above best_value can change the choice, so it is the lower bound;
+                # an action listed earlier than the current best also wins ties
+                bound = best_value
+                if best_index is not None and i < best_index:
+                    bound = math.nextafter(best_value, float('-inf'))
+                move_value = self.search(catcher_pos, new_pos, depth - 1, False, alpha=bound)
+                
+                if move_value > bound:
+                    best_value = move_value
+                    best_index = i
+        
+        return actions[best_index] if best_index is not None else None
+    
+    def search_root_parallel(self, actions, catcher_pos, runner_pos, depth, is_catcher):
+        """
+        Same choice as search_root, with each root action scored by a worker process.
+        Workers search with a full window, so every value is exact.
+        """
+        snapshot = self.env.snapshot()
+        tasks = []
+        for action in actions:
+            new_pos = action[2]
+            if is_catcher:
+                tasks.append((self.board_key, snapshot, self.worker_options, depth - 1, new_pos, runner_pos, True))
+            else:
+                tasks.append((self.board_key, snapshot, self.worker_options, depth - 1, catcher_pos, new_pos, False))
+        
+        results = list(get_pool(self.parallel_workers).map(score_root_action, tasks))
+        
+        best_action = None
+        best_value = float('inf') if is_catcher else float('-inf')
+        for action, (move_value, worker_stats) in zip(actions, results):
+            for field, value in worker_stats.items():
+                setattr(self.stats, field, getattr(self.stats, field) + value)
+            
+            if (move_value < best_value) if is_catcher else (move_value > best_value):
+                best_value = move_value
+                best_action = action
+        
+        return best_action
+    
+    def choose_root_action(self, actions, catcher_pos, runner_pos, is_catcher):
+        # Search the move suggested by earlier turns first
+        hint = self.root_hint(catcher_pos, runner_pos, is_catcher)
+        order = sorted(range(len(actions)), key=lambda i: actions[i][0] != "move" or actions[i][1] != hint)
+        
+        if self.time_budget_ms is None:
+            best_action = self.search_root(actions, catcher_pos, runner_pos, self.max_depth, is_catcher, order)
+            self.completed_depth = self.max_depth
+            self.remember_principal_variation(best_action, catcher_pos, runner_pos, is_catcher)
+            return best_action
+        
+        # Iterative deepening: the depth-1 search always completes, deeper ones
+        # are abandoned at the deadline and the last completed answer is kept
+        deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+        max_depth = self.max_depth or MAX_ITERATIVE_DEPTH
+        best_action = None
+        
+        try:
+            for depth in range(1, max_depth + 1):
+                action = self.search_root(actions, catcher_pos, runner_pos, depth, is_catcher, order)
+                if action is not None:
+                    best_action = action
+                    # Search the previous best action first in the next iteration
+                    best_index = actions.index(action)
+                    order = [best_index] + [i for i in order if i != best_index]
+                
+                self.completed_depth = depth
+                self.deadline = deadline
+                if time.perf_counter() >= deadline:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        
+        self.remember_principal_variation(best_action, catcher_pos, runner_pos, is_catcher)
+        return best_action
+    
+    def remember_principal_variation(self, best_action, catcher_pos, runner_pos, is_catcher):
+        """Keep the expected continuation of the chosen action as a hint for the next move."""
+        self.principal_variation = {}
+        if best_action is None:
+            return
+        
+        new_pos = best_action[2]
+        if is_catcher:
+            self.principal_variation = self.extract_principal_variation(
+                new_pos, runner_pos, True, self.completed_depth)
+        else:
+            self.principal_variation = self.extract_principal_variation(
+                catcher_pos, new_pos, False, self.completed_depth)
+    
+    def get_best_action_catcher(self, catcher_pos, runner_pos, catcher_agent, runner_agent=None):
+        self.reset_search()
+        if self.full_state:
+            return self.get_best_state_action(catcher_pos, runner_pos, catcher_agent, runner_agent, True)
         actions = []
         
         # Current distance
@@ -201,7 +828,7 @@ class Minimax:
             # Try placing walls in adjacent cells
             for direction in self.directions:
                 wall_pos = self.get_new_position(catcher_pos, direction)
-                if wall_pos and self.env.grid[wall_pos] == 0 and wall_pos not in self.env.temporary_walls:
+                if wall_pos and self.is_position_valid(wall_pos):
                     # Check if this wall traps the runner
                     if self.check_if_trapped(runner_pos, catcher_pos, wall_pos):
                         # Stay in place but mark to use wall builder
@@ -211,19 +838,17 @@ class Minimax:
             return ("move", None, None)
         
         # Evaluate all actions using minimax
-        best_action = None
-        best_value = float('inf')
+        best_action = self.choose_root_action(actions, catcher_pos, runner_pos, is_catcher=True)
         
-        for action_type, direction, new_pos, wall_pos in actions:
-            move_value = self.minimax(new_pos, runner_pos, self.max_depth - 1, True)
-            
-            if move_value < best_value:
-                best_value = move_value
-                best_action = (action_type, direction, wall_pos)
-        
-        return best_action if best_action else ("move", None, None)
+        if best_action is None:
+            return ("move", None, None)
+        action_type, direction, new_pos, wall_pos = best_action
+        return (action_type, direction, wall_pos)
     
-    def get_best_action_runner(self, catcher_pos, runner_pos, runner_agent):
+    def get_best_action_runner(self, catcher_pos, runner_pos, runner_agent, catcher_agent=None):
+        self.reset_search()
+        if self.full_state:
+            return self.get_best_state_action(catcher_pos, runner_pos, catcher_agent, runner_agent, False)
         actions = []
         
         current_distance = self.real_path_distance(catcher_pos, runner_pos)
@@ -251,15 +876,9 @@ class Minimax:
         if runner_agent.has_item("wall_builder"):
             for direction in self.directions:
                 wall_pos = self.get_new_position(runner_pos, direction)
-                if wall_pos and self.env.grid[wall_pos] == 0 and wall_pos not in self.env.temporary_walls:
-                    # Temporarily place wall and check distance change
-                    original_value = self.env.grid[wall_pos]
-                    self.env.grid[wall_pos] = 1
-                    
-                    new_distance = self.real_path_distance(catcher_pos, runner_pos)
-                    
-                    # Restore
-                    self.env.grid[wall_pos] = original_value
+                if wall_pos and self.is_position_valid(wall_pos):
+                    # Distance with a hypothetical wall (env.grid is left untouched)
+                    new_distance = self.real_path_distance(catcher_pos, runner_pos, extra_walls={wall_pos})
                     
                     # Use wall if it increases distance by more than 2
                     if new_distance - current_distance > 2:
@@ -269,14 +888,9 @@ class Minimax:
             return ("move", None, None)
         
         # Evaluate all actions
-        best_action = None
-        best_value = float('-inf')
+        best_action = self.choose_root_action(actions, catcher_pos, runner_pos, is_catcher=False)
         
-        for action_type, direction, new_pos, wall_pos in actions:
-            move_value = self.minimax(catcher_pos, new_pos, self.max_depth - 1, False)
-            
-            if move_value > best_value:
-                best_value = move_value
-                best_action = (action_type, direction, wall_pos)
-        
-        return best_action if best_action else ("move", None, None)
+        if best_action is None:
+            return ("move", None, None)
+        action_type, direction, new_pos, wall_pos = best_action
+        return (action_type, direction, wall_pos)
@@ -0,0 +1,50 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from environment.grid import GridEnvironment
+
+_pools = {}
+
+# Per-worker cache: the Minimax built for the last board seen by this process
+_worker_board_key = None
+_worker_minimax = None
+
+
+def get_pool(workers):
+    """Persistent process pool, shared by every search using the same worker count."""
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        _pools[workers] = pool
+    return pool
+
+
+def shutdown_pools():
+    """Stop every pool (at exit, and after each Benchmark experiment)."""
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
+
+
+atexit.register(shutdown_pools)
+
+
+def score_root_action(task):
+    """
+    Worker entry point: full-window search of one root action.
+    The environment and Minimax (distance oracle, power-up fields, tables)
+    are rebuilt only when the board differs from the previous task.
+    """
+    global _worker_board_key, _worker_minimax
+    from algorithms.minimax import Minimax
+
+    board_key, snapshot, options, depth, catcher_pos, runner_pos, is_maximizing = task
+
+    if board_key != _worker_board_key or _worker_minimax is None:
+        env = GridEnvironment.from_snapshot(snapshot)
+        _worker_minimax = Minimax(env, max_depth=depth, **options)
+        _worker_board_key = board_key
+
+    minimax = _worker_minimax
+    minimax.reset_search()
+    value = minimax.search(catcher_pos, runner_pos, depth, is_maximizing)
+    return value, minimax.stats.as_dict()
@@ -0,0 +1,102 @@
+import numpy as np
+from environment.grid import POWER_UP_CODES, UNREACHABLE
+
+
+class PowerUpFields:
+    """
+    fields[i, cell]: moves from cell to the i-th power-up (a cell inside a wall steps out first),
+    cached until a power-up or a wall changes. With clamp, distances stop at clamp and only near
+    cells are searched.
+    """
+
+    def __init__(self, env, clamp=None):
+        self.env = env
+        self.clamp = clamp
+        self.version = None
+        self.sync()
+
+    def sync(self):
+        env = self.env
+        version = (env.power_up_version, len(env.wall_changes))
+        if version == self.version:
+            return
+        self.version = version
+
+        positions = list(env.power_ups.keys())
+        self.positions = positions
+        self.types = np.array([POWER_UP_CODES[env.power_ups[pos]] for pos in positions], dtype=np.intp)
+
+        if self.clamp is None:
+            self.fields = self.build_fields(positions).reshape(len(positions), env.rows * env.cols)
+        else:
+            self.fields = self.build_near_fields(positions)
+
+    def build_fields(self, positions):
+        """The environment's distance field of every power-up, stacked."""
+        env = self.env
+        free = env.grid == 0
+        count = len(positions)
+
+        distances = np.full((count, env.rows, env.cols), UNREACHABLE, dtype=np.int32)
+        for i, (r, c) in enumerate(positions):
+            if free[r, c]:
+                distances[i] = env.distance_field((r, c))
+            else:
+                distances[i, r, c] = 0  # A power-up under a wall is unreachable
+
+        # Wall cells: one step out to the closest free neighbor
+        open_distances = np.where(free, distances, UNREACHABLE)
+        nearest = np.full_like(distances, UNREACHABLE)
+        nearest[:, 1:, :] = np.minimum(nearest[:, 1:, :], open_distances[:, :-1, :])
+        nearest[:, :-1, :] = np.minimum(nearest[:, :-1, :], open_distances[:, 1:, :])
+        nearest[:, :, 1:] = np.minimum(nearest[:, :, 1:], open_distances[:, :, :-1])
+        nearest[:, :, :-1] = np.minimum(nearest[:, :, :-1], open_distances[:, :, 1:])
+        from_wall = np.where(nearest < UNREACHABLE, nearest + 1, UNREACHABLE)
+
+        return np.where(~free & (distances != 0), from_wall, distances)
+
+    def build_near_fields(self, positions):
+        """
+        The fields clamped at clamp, from a BFS of clamp - 1 steps around each power-up
+        (the cost does not grow with the map).
+        """
+        env = self.env
+        clamp, rows, cols = self.clamp, env.rows, env.cols
+        walkable = env.walkable
+
+        fields = np.full((len(positions), rows * cols), clamp, dtype=np.uint8 if clamp < 256 else np.int32)
+        for i, (r, c) in enumerate(positions):
+            source = r * cols + c
+            fields[i, source] = 0
+            if not walkable[source]:
+                continue  # A power-up under a wall is unreachable
+
+            distances = {source: 0}
+            frontier = [source]
+            for distance in range(1, clamp):
+                next_frontier = []
+                for cell in frontier:
+                    for neighbor in env.free_neighbors(cell):
+                        if neighbor not in distances:
+                            distances[neighbor] = distance
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+
+            # Wall cells: one step out to the closest free neighbor
+            near = dict(distances)
+            for cell, distance in distances.items():
+                if distance + 1 >= clamp:
+                    continue
+                row, col = divmod(cell, cols)
+                for inside, neighbor in ((row > 0, cell - cols), (row < rows - 1, cell + cols),
+                                         (col > 0, cell - 1), (col < cols - 1, cell + 1)):
+                    if inside and not walkable[neighbor] and near.get(neighbor, clamp) > distance + 1:
+                        near[neighbor] = distance + 1
+
+            fields[i, list(near)] = list(near.values())
+        return fields
+
+    def distances_from(self, pos):
+        """Distances from pos to every power-up, in env.power_ups order."""
+        self.sync()
+        return self.fields[:, pos[0] * self.env.cols + pos[1]]
@@ -0,0 +1,22 @@
+class SearchStats:
+    """Counters for the search done for a single move."""
+
+    FIELDS = [
+        "nodes_expanded",    # Nodes whose successors were generated
+        "leaf_evaluations",  # Calls to the evaluation function
+        "distance_calls",    # Calls to real_path_distance
+        "distance_time",     # Seconds spent inside real_path_distance
+        "cutoffs",           # Alpha-beta cutoffs (including transposition table cutoffs)
+        "nodes_pruned",      # Siblings skipped by alpha-beta cutoffs
+        "cache_hits",        # Transposition table and evaluation cache hits
+    ]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
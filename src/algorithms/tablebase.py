@@ -0,0 +1,173 @@
+import hashlib
+import os
+import numpy as np
+from environment.grid import DIRECTIONS, DIRECTION_DELTAS
+
+ESCAPE = np.iinfo(np.uint16).max  # The Runner is never caught under perfect play
+MAX_CELLS = 2500  # Measured: solve takes about 13 s and 140 MB at 2464 free cells (time grows faster than n^2)
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "tablebases")
+
+CATCHER_TO_MOVE = 0
+RUNNER_TO_MOVE = 1
+
+
+def grid_signature(grid):
+    """Short hash identifying a wall layout."""
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    digest = hashlib.sha1(str(grid.shape).encode() + grid.tobytes()).hexdigest()
+    return digest[:16]
+
+
+def capture_matrix(positions):
+    """capture[c, r] is True when GameSimulator.can_capture(positions[c], positions[r])."""
+    rows = np.array([pos[0] for pos in positions])
+    cols = np.array([pos[1] for pos in positions])
+    row_diff = np.abs(rows[:, None] - rows[None, :])
+    col_diff = np.abs(cols[:, None] - cols[None, :])
+    return ((row_diff == 0) & (col_diff == 0)) | ((row_diff == 1) & (col_diff == 1))
+
+
+def solve(grid):
+    """
+    Retrograde solution of the walls-only game: values[side, catcher_cell, runner_cell] is the
+    number of plies (single moves) to capture under perfect play, or ESCAPE if the Runner is never caught.
+    """
+    rows, cols = grid.shape
+    free = np.flatnonzero(grid.ravel() == 0)
+    n = len(free)
+    if n > MAX_CELLS:
+        raise ValueError(f"Map too large for a tablebase ({n} free cells, max {MAX_CELLS})")
+
+    positions = [(int(cell) // cols, int(cell) % cols) for cell in free]
+    index = {pos: i for i, pos in enumerate(positions)}
+    neighbors = np.full((n, 4), n, dtype=np.intp)  # n = no neighbor
+    for i, (r, c) in enumerate(positions):
+        for k, (dr, dc) in enumerate(DIRECTION_DELTAS):
+            j = index.get((r + dr, c + dc))
+            if j is not None:
+                neighbors[i, k] = j
+    stuck = (neighbors == n).all(axis=1)
+
+    caught = np.nonzero(capture_matrix(positions))
+    catcher_values = np.full((n, n), ESCAPE, dtype=np.uint16)
+    catcher_values[caught] = 0
+    runner_values = catcher_values.copy()
+    new_catcher = np.empty_like(catcher_values)
+    new_runner = np.empty_like(runner_values)
+    moves = [(neighbors[:, k] < n, neighbors[:, k][neighbors[:, k] < n]) for k in range(4)]
+
+    # Value iteration from "never caught": every sweep lets captures propagate
+    # one more ply backwards, until nothing changes. A move onto a capture
+    # reads 0 there, so every move is "one ply more than the next position"
+    # (ESCAPE stays ESCAPE)
+    while True:
+        # Catcher to move: best (smallest) outcome over its moves
+        new_catcher.fill(ESCAPE)
+        for has, moved in moves:
+            new_catcher[has] = np.minimum(new_catcher[has], runner_values[moved])
+        new_catcher[stuck] = runner_values[stuck]
+        np.add(new_catcher, new_catcher < ESCAPE, out=new_catcher, casting="unsafe")
+        new_catcher[caught] = 0
+
+        # Runner to move: best (largest) outcome over its moves
+        new_runner.fill(0)
+        for has, moved in moves:
+            new_runner[:, has] = np.maximum(new_runner[:, has], new_catcher[:, moved])
+        new_runner[:, stuck] = new_catcher[:, stuck]
+        np.add(new_runner, new_runner < ESCAPE, out=new_runner, casting="unsafe")
+        new_runner[caught] = 0
+
+        if np.array_equal(new_catcher, catcher_values) and np.array_equal(new_runner, runner_values):
+            break
+        catcher_values, new_catcher = new_catcher, catcher_values
+        runner_values, new_runner = new_runner, runner_values
+
+    return np.stack([catcher_values, runner_values])
+
+
+class Tablebase:
+    """
+    Perfect-play table for the walls-only game on one map, stored as a .npy
+    file under assets/tablebases and opened as a read-only memory map.
+    """
+
+    def __init__(self, grid, values):
+        self.grid = np.array(grid, dtype=np.uint8)
+        self.signature = grid_signature(self.grid)
+        cols = self.grid.shape[1]
+        free = np.flatnonzero(self.grid.ravel() == 0)
+        self.index = {(int(cell) // cols, int(cell) % cols): i for i, cell in enumerate(free)}
+        self.values = values
+
+    @staticmethod
+    def path_for(grid, directory=DEFAULT_DIRECTORY):
+        return os.path.join(directory, f"tablebase_{grid_signature(grid)}.npy")
+
+    @staticmethod
+    def build_file(grid, path):
+        values = solve(np.asarray(grid))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        table = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint16, shape=values.shape)
+        table[:] = values
+        table.flush()
+        del table
+
+    @classmethod
+    def load(cls, env, directory=DEFAULT_DIRECTORY, build=True):
+        """Open the table for the env's original walls, building it first if needed."""
+        grid = env.original_grid
+        path = cls.path_for(grid, directory)
+        if not os.path.exists(path):
+            if not build:
+                raise FileNotFoundError(path)
+            cls.build_file(grid, path)
+        return cls(grid, np.load(path, mmap_mode="r"))
+
+    def applies_to(self, env):
+        """The table is exact only while no wall has been placed."""
+        return not env.temporary_walls and np.array_equal(env.grid, self.grid)
+
+    def value(self, catcher_pos, runner_pos, catcher_to_move):
+        side = CATCHER_TO_MOVE if catcher_to_move else RUNNER_TO_MOVE
+        return int(self.values[side, self.index[catcher_pos], self.index[runner_pos]])
+
+    def best_move(self, env, catcher_pos, runner_pos, is_catcher):
+        """
+        Direction of the perfect-play move, or None when the table does not apply, there is no
+        move or the Catcher can not catch the Runner. Ties keep the first direction.
+        """
+        if not self.applies_to(env) or catcher_pos not in self.index or runner_pos not in self.index:
+            return None
+
+        best_direction = None
+        best_value = None
+        mover = catcher_pos if is_catcher else runner_pos
+
+        for direction, (dr, dc) in zip(DIRECTIONS, DIRECTION_DELTAS):
+            new_pos = (mover[0] + dr, mover[1] + dc)
+            if new_pos not in self.index:
+                continue
+
+            if is_catcher:
+                c, r = new_pos, runner_pos
+            else:
+                c, r = catcher_pos, new_pos
+
+            row_diff, col_diff = abs(c[0] - r[0]), abs(c[1] - r[1])
+            if (row_diff, col_diff) in ((0, 0), (1, 1)):  # GameSimulator.can_capture
+                move_value = 1
+            else:
+                next_value = self.value(c, r, catcher_to_move=not is_catcher)
+                move_value = ESCAPE if next_value == ESCAPE else next_value + 1
+
+            if (best_value is None or
+                    (move_value < best_value if is_catcher else move_value > best_value)):
+                best_value = move_value
+                best_direction = direction
+
+        if is_catcher and best_value == ESCAPE:
+            # Every move lets the Runner escape, so the table has no preference:
+            # the caller plays its fallback (A*) instead of the first direction
+            return None
+        return best_direction
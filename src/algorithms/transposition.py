@@ -0,0 +1,118 @@
+import numpy as np
+from environment.grid import POWER_UP_TYPES
+
+# Bound types stored with each entry
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+MASK_64 = (1 << 64) - 1
+
+
+def mix64(value):
+    """SplitMix64 finalizer: a well spread 64-bit key from a counter."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+class CellKeys(dict):
+    """
+    cell -> key of one Zobrist table, drawn on first lookup (large maps only reach a few cells).
+    The key of a cell does not depend on the order of the lookups.
+    """
+
+    def __init__(self, table):
+        super().__init__()
+        self.base = table << 32  # Above any cell id
+
+    def __missing__(self, cell):
+        key = self[cell] = mix64(self.base | cell)
+        return key
+
+
+class ZobristHasher:
+    """
+    Zobrist keys for the full game state: both agent positions, side to move,
+    walls, temporary walls and power-ups.
+    """
+
+    def __init__(self, rows, cols, seed=0):
+        cells = rows * cols
+        self.cols = cols
+
+        tables = seed * (3 + len(POWER_UP_TYPES))
+        self.catcher_keys = CellKeys(tables)
+        self.runner_keys = CellKeys(tables + 1)
+        self.temporary_wall_keys = CellKeys(tables + 2)
+        self.power_up_keys = {
+            power_type: CellKeys(tables + 3 + t)
+            for t, power_type in enumerate(POWER_UP_TYPES)
+        }
+        # Hashed all at once by board_hash
+        self.wall_keys = np.random.default_rng(seed).integers(0, MASK_64, size=cells, dtype=np.uint64, endpoint=True)
+        self.side_key = mix64(MASK_64 ^ seed)  # XORed in when the Runner is to move
+
+    def cell_index(self, pos):
+        return pos[0] * self.cols + pos[1]
+
+    def board_hash(self, env):
+        """Hash of everything except the agents: walls, temporary walls and power-ups."""
+        walls = self.wall_keys[env.grid.ravel() == 1]
+        key = int(np.bitwise_xor.reduce(walls)) if len(walls) else 0
+
+        for pos in env.temporary_walls:
+            key ^= self.temporary_wall_keys[self.cell_index(pos)]
+
+        for pos, power_type in env.power_ups.items():
+            key ^= self.power_up_keys[power_type][self.cell_index(pos)]
+
+        return key
+
+    def state_hash(self, board_key, catcher_pos, runner_pos, is_maximizing):
+        key = (board_key
+               ^ self.catcher_keys[self.cell_index(catcher_pos)]
+               ^ self.runner_keys[self.cell_index(runner_pos)])
+        if is_maximizing:
+            key ^= self.side_key
+        return key
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results: (key, depth, value, bound, best_move, generation).
+    A slot is overwritten by the same position, by anything when it is from an older search,
+    otherwise only by an equal or deeper search.
+    """
+
+    ENTRY_BYTES = 160  # Approximate size of one stored tuple in CPython
+
+    def __init__(self, max_memory_mb=8):
+        self.size = max(1, int(max_memory_mb * 1024 * 1024) // self.ENTRY_BYTES)
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+
+    def probe(self, key):
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, value, bound, best_move):
+        index = key % self.size
+        current = self.entries[index]
+
+        if (current is None or current[0] == key or
+                current[5] != self.generation or depth >= current[1]):
+            self.entries[index] = (key, depth, value, bound, best_move, self.generation)
+
+    def new_search(self):
+        self.generation += 1
+        self.hits = 0
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.hits = 0
@@ -3,31 +3,14 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from environment.grid import GridEnvironment
+from environment.maps import load_map
 from agents.catcher import Catcher
 from agents.runner import Runner
 from visualization.game_visualizer import GameVisualizer
 from game.simulator import GameSimulator
 import time
 
-map_data = [
-    "#################",
-    "#...............#",
-    "#.#####...#.#...#",
-    "#.#.......#.#...#",
-    "#.#.###.###.###.#",
-    "#.#.#...........#",
-    "#.#.#...###.###.#",
-    "#.........#.#...#",
-    "#...###...#.#...#",
-    "#...###.........#",
-    "#...###...#######",
-    "#.........#.....#",
-    "#.#...#.#.#...#.#",
-    "#.#...#.#.#...#.#",
-    "#.#####.#.....#.#",
-    "#.......#.....#.#",
-    "#################"
-]
+map_data = load_map("classic")
 
 def run_visual_demo(turn_delay): # turn_delay: Seconds to wait between turns
     
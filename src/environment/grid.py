@@ -1,27 +1,133 @@
 import numpy as np
 import random
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+from environment.maps import grid_from_rows
+
+POWER_UP_TYPES = ["speed_boost", "wall_builder", "ghost_mode", "teleport"]
+SPEED_BOOST, WALL_BUILDER, GHOST_MODE, TELEPORT = range(len(POWER_UP_TYPES))  # Integer codes of the types (GameState, BatchSimulator)
+POWER_UP_CODES = {power_type: code for code, power_type in enumerate(POWER_UP_TYPES)}
+
+DIRECTIONS = ["up", "down", "left", "right"]
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+DIRECTION_DELTAS = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # (row, col) step of each direction, in DIRECTIONS order
+
+TEMPORARY_WALL_TURNS = 5  # Turns a wall placed by an agent stays on the map
+SPEED_BOOST_TURNS = 3  # Turns a speed boost lasts (Agent.activate_speed_boost)
+
+UNREACHABLE = np.iinfo(np.int32).max // 2  # distance_field value of cells that cannot be reached
+MAX_CACHED_FIELD_CELLS = 1 << 24  # 64 MB of int32 distance fields
 
 class GridEnvironment:
-    def __init__(self, map_data):
-        self.rows = len(map_data)
-        self.cols = len(map_data[0])
-        self.grid = np.zeros((self.rows, self.cols), dtype=int)
-        self.original_grid = np.copy(self.grid)
-        
-        for r, line in enumerate(map_data):
-            for c, char in enumerate(line):
-                if char == "#":
-                    self.grid[r, c] = 1
+    def __init__(self, map_data, rng=None):
+        """
+        map_data: list of strings ('#' = wall) or a 2-D array (non-zero = wall), see environment.maps.
+        rng: random.Random used for spawns and teleports (default: the global random module).
+        """
+        self.rng = rng or random
+        if isinstance(map_data, np.ndarray):
+            self.grid = (map_data != 0).astype(np.uint8)
+        else:
+            self.grid = grid_from_rows(map_data)
+        self.rows, self.cols = self.grid.shape
         
         self.original_grid = np.copy(self.grid)
+        self.build_adjacency()
         self.agents = {}
+        self.build_free_cell_index()
         self.power_ups = {}
-        self.temporary_walls = {}
+        self.power_up_version = 0  # Bumped whenever power_ups changes
+        self.temporary_walls = {}  # Wall placed by an agent -> turns left before it disappears
+        self.wall_changes = []  # Cells that became or stopped being walls after construction, in order
+        self.distance_fields = {}  # (sources, extra_blocked) -> field, for the current wall layout
+        self.distance_fields_version = 0
         self.teleport_corners = [(1, 1), (1, self.cols-2), (self.rows-2, 1), (self.rows-2, self.cols-2)]
 
+    def build_adjacency(self):
+        """
+        Flat walkability and neighbor table, indexed by cell = row * cols + col.
+        walkable[cell] is 1 for free cells. The free neighbors of a cell, in
+        up/down/left/right order, are neighbor_table[4 * cell : 4 * cell + neighbor_count[cell]]
+        (CSR layout with a fixed stride of 4, no bounds checks needed). Wall
+        cells have rows too, for agents in ghost mode. place_wall and
+        remove_wall keep both in sync.
+        """
+        rows, cols = self.rows, self.cols
+        free = self.grid == 0
+        self.walkable = bytearray(free.tobytes())
+        
+        ids = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+        candidates = np.full((rows, cols, 4), -1, dtype=np.int32)
+        candidates[1:, :, 0] = ids[:-1, :]
+        candidates[:-1, :, 1] = ids[1:, :]
+        candidates[:, 1:, 2] = ids[:, :-1]
+        candidates[:, :-1, 3] = ids[:, 1:]
+        candidates = candidates.reshape(-1, 4)
+        
+        valid = candidates >= 0
+        valid[valid] = free.ravel()[candidates[valid]]
+        order = np.argsort(~valid, axis=1, kind="stable")  # Free neighbors first, direction order kept
+        table = np.where(np.take_along_axis(valid, order, axis=1), np.take_along_axis(candidates, order, axis=1), -1)
+        
+        self.neighbor_table = array("i", table.astype(np.int32).tobytes())
+        self.neighbor_count = bytearray(valid.sum(axis=1).astype(np.uint8).tobytes())
+    
+    def refresh_neighbors(self, cell):
+        """Rebuild the neighbor_table row of one cell from walkable."""
+        row, col = divmod(cell, self.cols)
+        walkable, table = self.walkable, self.neighbor_table
+        base = 4 * cell
+        count = 0
+        for inside, neighbor in ((row > 0, cell - self.cols), (row < self.rows - 1, cell + self.cols),
+                                 (col > 0, cell - 1), (col < self.cols - 1, cell + 1)):
+            if inside and walkable[neighbor]:
+                table[base + count] = neighbor
+                count += 1
+        for slot in range(count, 4):
+            table[base + slot] = -1
+        self.neighbor_count[cell] = count
+    
+    def free_neighbors(self, cell):
+        """Ids of the free cells next to cell, in up/down/left/right order."""
+        base = 4 * cell
+        return self.neighbor_table[base:base + self.neighbor_count[cell]]
+    
+    def build_free_cell_index(self):
+        """
+        free_columns[row] = sorted columns of the cells of that row that
+        get_free_cells returns (no wall, no agent). Kept up to date by
+        add_agent, move_agent, teleport_agent, place_wall and remove_wall, so spawning
+        never scans the whole grid.
+        """
+        self.free_columns = [np.flatnonzero(self.grid[r] == 0).tolist() for r in range(self.rows)]
+        for pos in self.agents.values():
+            self.remove_free_cell(pos)
+    
+    def remove_free_cell(self, pos):
+        columns = self.free_columns[pos[0]]
+        i = bisect_left(columns, pos[1])
+        if i < len(columns) and columns[i] == pos[1]:
+            del columns[i]
+    
+    def restore_free_cell(self, pos):
+        """Put pos back in the index if it is walkable and no agent stands on it."""
+        if self.walkable[pos[0] * self.cols + pos[1]] and pos not in self.agents.values():
+            columns = self.free_columns[pos[0]]
+            i = bisect_left(columns, pos[1])
+            if i == len(columns) or columns[i] != pos[1]:
+                insort(columns, pos[1])
+    
+    def set_agent_position(self, name, pos):
+        old_pos = self.agents.get(name)
+        self.agents[name] = pos
+        self.remove_free_cell(pos)
+        if old_pos is not None and old_pos != pos:
+            self.restore_free_cell(old_pos)
+    
     def add_agent(self, name, pos):
-        if self.grid[pos[0], pos[1]] == 0:
-            self.agents[name] = pos
+        if self.walkable[pos[0] * self.cols + pos[1]]:
+            self.set_agent_position(name, pos)
         else:
             raise ValueError("Cell occupied by wall!")
 
@@ -41,7 +147,7 @@ class GridEnvironment:
         if 0 <= row < self.rows and 0 <= col < self.cols:
             if ignore_walls:
                 return True
-            return self.grid[row, col] == 0
+            return self.walkable[row * self.cols + col] == 1
         return False
 
     def move_agent(self, name, direction, use_ghost_mode=False):
@@ -59,45 +165,152 @@ class GridEnvironment:
                 col -= 1
             elif direction == "right":
                 col += 1
-            self.agents[name] = (row, col)
+            self.set_agent_position(name, (row, col))
             return True
         return False
     
-    def place_wall(self, pos):
+    def place_wall(self, pos, turns=TEMPORARY_WALL_TURNS):
         if 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols:
-            if self.grid[pos[0], pos[1]] == 0:
+            cell = pos[0] * self.cols + pos[1]
+            if self.walkable[cell]:
                 self.grid[pos[0], pos[1]] = 1
-                self.temporary_walls[pos] = True  # Mark as player-placed wall
+                self.walkable[cell] = 0
+                for neighbor in (cell - self.cols, cell + self.cols, cell - 1, cell + 1):
+                    if 0 <= neighbor < len(self.walkable) and cell in self.free_neighbors(neighbor):
+                        self.refresh_neighbors(neighbor)
+                self.remove_free_cell(pos)
+                self.temporary_walls[pos] = turns  # Mark as player-placed wall
+                self.wall_changes.append(pos)
                 return True
         return False
     
+    def remove_wall(self, pos):
+        """Take away a wall placed with place_wall."""
+        if pos not in self.temporary_walls:
+            return False
+        del self.temporary_walls[pos]
+        row, col = pos
+        cell = row * self.cols + col
+        self.grid[row, col] = 0
+        self.walkable[cell] = 1
+        for inside, neighbor in ((row > 0, cell - self.cols), (row < self.rows - 1, cell + self.cols),
+                                 (col > 0, cell - 1), (col < self.cols - 1, cell + 1)):
+            if inside:
+                self.refresh_neighbors(neighbor)
+        self.restore_free_cell(pos)
+        self.wall_changes.append(pos)
+        return True
+    
+    def update_temporary_walls(self):
+        """End of a turn: every placed wall loses a turn, and the ones at zero disappear."""
+        expired = []
+        for pos, turns in self.temporary_walls.items():
+            if turns <= 1:
+                expired.append(pos)
+            else:
+                self.temporary_walls[pos] = turns - 1
+        for pos in expired:
+            self.remove_wall(pos)
+        return expired
+    
+    def distance_field(self, source, extra_blocked=None):
+        """
+        Number of moves from source to every cell, as a read-only int32
+        (rows, cols) array; cells that cannot be reached are UNREACHABLE.
+        source: a (row, col) cell or a list of cells (distance to the nearest).
+        extra_blocked: cells treated as walls on top of grid.
+        Walls are never entered, but a source inside a wall still spreads to
+        its free neighbors (an agent in ghost mode).
+        Fields are cached until the wall layout changes (a wall placed or removed).
+        """
+        sources = (source,) if isinstance(source, tuple) and not isinstance(source[0], tuple) else tuple(source)
+        key = (sources, frozenset(extra_blocked) if extra_blocked else None)
+        
+        if self.distance_fields_version != len(self.wall_changes):
+            self.distance_fields = {}
+            self.distance_fields_version = len(self.wall_changes)
+        
+        field = self.distance_fields.get(key)
+        if field is None:
+            if (len(self.distance_fields) + 1) * self.grid.size > MAX_CACHED_FIELD_CELLS:
+                self.distance_fields = {}
+            field = self.compute_distance_field(sources, key[1])
+            field.flags.writeable = False
+            self.distance_fields[key] = field
+        return field
+    
+    def compute_distance_field(self, sources, extra_blocked=None):
+        """Wavefront BFS over shifted grid masks, restricted to the box the wave can have reached."""
+        unvisited = self.grid == 0
+        for r, c in extra_blocked or ():
+            unvisited[r, c] = False
+        
+        field = np.full((self.rows, self.cols), UNREACHABLE, dtype=np.int32)
+        for r, c in sources:
+            field[r, c] = 0
+            unvisited[r, c] = False
+        
+        top = min(r for r, _ in sources)
+        bottom = max(r for r, _ in sources) + 1
+        left = min(c for _, c in sources)
+        right = max(c for _, c in sources) + 1
+        
+        step = 0
+        while True:
+            step += 1
+            top, bottom = max(top - 1, 0), min(bottom + 1, self.rows)
+            left, right = max(left - 1, 0), min(right + 1, self.cols)
+            window = field[top:bottom, left:right]
+            frontier = window == step - 1
+            
+            reached = np.zeros_like(frontier)
+            reached[1:, :] |= frontier[:-1, :]
+            reached[:-1, :] |= frontier[1:, :]
+            reached[:, 1:] |= frontier[:, :-1]
+            reached[:, :-1] |= frontier[:, 1:]
+            reached &= unvisited[top:bottom, left:right]
+            if not reached.any():
+                return field
+            
+            window[reached] = step
+            unvisited[top:bottom, left:right] &= ~reached
+    
     def teleport_agent(self, name):
         if name in self.agents:
             available_corners = [c for c in self.teleport_corners if c not in self.agents.values()]
             if available_corners:
-                self.agents[name] = random.choice(available_corners)
+                self.set_agent_position(name, self.rng.choice(available_corners))
                 return True
         return False
 
     def get_free_cells(self, row_range=None):
-        free_cells = []
         start_row = row_range[0] if row_range else 0
-        end_row = row_range[1] if row_range else self.rows
-        
-        for r in range(start_row, end_row):
-            for c in range(self.cols):
-                if self.grid[r, c] == 0 and (r, c) not in self.agents.values():
-                    free_cells.append((r, c))
-        return free_cells
+        end_row = min(row_range[1], self.rows) if row_range else self.rows
+        return [(r, c) for r in range(start_row, end_row) for c in self.free_columns[r]]
+    
+    def free_cell_counts(self, row_range=None):
+        """(first row, cumulative number of free cells per row) over row_range."""
+        start_row = row_range[0] if row_range else 0
+        end_row = min(row_range[1], self.rows) if row_range else self.rows
+        return start_row, list(accumulate(len(self.free_columns[r]) for r in range(start_row, end_row)))
+    
+    def free_cell_at(self, index, counts):
+        """get_free_cells(row_range)[index] without building the list (counts from free_cell_counts)."""
+        start_row, cumulative = counts
+        row = bisect_right(cumulative, index)
+        before = cumulative[row - 1] if row > 0 else 0
+        return (start_row + row, self.free_columns[start_row + row][index - before])
     
     def spawn_power_ups(self, speed_boosts=3, wall_builders=2, ghost_modes=2):
-        free_cells = self.get_free_cells()
+        counts = self.free_cell_counts()
+        free_count = counts[1][-1] if counts[1] else 0
         
         total_powerups = speed_boosts + wall_builders + ghost_modes
-        if len(free_cells) < total_powerups:
+        if free_count < total_powerups:
             return []
         
-        spawn_positions = random.sample(free_cells, total_powerups)
+        # Same draws as random.sample(self.get_free_cells(), total_powerups)
+        spawn_positions = [self.free_cell_at(i, counts) for i in self.rng.sample(range(free_count), total_powerups)]
         
         idx = 0
         for _ in range(speed_boosts):
@@ -110,27 +323,54 @@ class GridEnvironment:
             self.power_ups[spawn_positions[idx]] = "ghost_mode"
             idx += 1
         
+        self.power_up_version += 1
         return spawn_positions
     
     def spawn_teleport(self):
         center = (self.rows // 2, self.cols // 2)
         self.power_ups[center] = "teleport"
+        self.power_up_version += 1
         return center
     
     def get_random_spawn_position(self, row_range=None):
-        free_cells = self.get_free_cells(row_range)
-        if not free_cells:
+        counts = self.free_cell_counts(row_range)
+        if not counts[1] or counts[1][-1] == 0:
             raise ValueError("No free cells available!")
-        return random.choice(free_cells)
+        # Same draw as random.choice(self.get_free_cells(row_range))
+        return self.free_cell_at(self.rng.randrange(counts[1][-1]), counts)
     
     def collect_power_up(self, pos):
         if pos in self.power_ups:
             power_up_type = self.power_ups[pos]
             if power_up_type != "teleport":
                 del self.power_ups[pos]
+                self.power_up_version += 1
             return power_up_type
         return None
     
+    def snapshot(self):
+        """Compact picklable copy of the layout, power-ups and agent positions."""
+        return {
+            "shape": (self.rows, self.cols),
+            "grid": self.grid.tobytes(),
+            "temporary_walls": list(self.temporary_walls.items()),
+            "power_ups": list(self.power_ups.items()),
+            "agents": list(self.agents.items()),
+        }
+    
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        rows, cols = snapshot["shape"]
+        env = cls(["." * cols] * rows)
+        env.grid[:] = np.frombuffer(snapshot["grid"], dtype=np.uint8).reshape(rows, cols)
+        env.original_grid = np.copy(env.grid)
+        env.build_adjacency()
+        env.temporary_walls = dict(snapshot["temporary_walls"])
+        env.power_ups = dict(snapshot["power_ups"])
+        env.agents = dict(snapshot["agents"])
+        env.build_free_cell_index()
+        return env
+    
     def print_grid(self):
         display = np.array(self.grid, dtype=str)
         display[display == "0"] = "◾"
@@ -0,0 +1,201 @@
+import random
+import numpy as np
+
+MAP_KINDS = ["maze", "rooms", "open"]
+MIN_SIZE = 5
+
+
+def generate_map(kind, rows, cols, seed=None, **options):
+    """
+    Seeded procedural map as a uint8 grid (1 = wall), meant for 17x17 up to
+    2000x2000. The border is always wall, every free cell is reachable from
+    every other, and the teleport corners and the center cell are free.
+    """
+    generators = {"maze": generate_maze, "rooms": generate_rooms, "open": generate_open_field}
+    if kind not in generators:
+        raise ValueError(f"Unknown map kind {kind!r}, expected one of {MAP_KINDS}")
+    if rows < MIN_SIZE or cols < MIN_SIZE:
+        raise ValueError(f"Maps must be at least {MIN_SIZE}x{MIN_SIZE}")
+    return generators[kind](rows, cols, seed=seed, **options)
+
+
+def special_cells(rows, cols):
+    """Cells the game expects to be free: GridEnvironment.teleport_corners and the teleport at the center."""
+    return [(1, 1), (1, cols - 2), (rows - 2, 1), (rows - 2, cols - 2), (rows // 2, cols // 2)]
+
+
+def generate_maze(rows, cols, seed=None, loop_chance=0.05):
+    """
+    Recursive-backtracker maze on the odd cells, plus loop_chance of the
+    remaining inner walls knocked down (a perfect maze has a single route
+    between two cells, which makes the chase trivial).
+    """
+    rng = random.Random(seed)
+    grid = np.ones((rows, cols), dtype=np.uint8)
+    height, width = (rows - 1) // 2, (cols - 1) // 2
+
+    # Cell (i, j) of the maze is grid cell (2i + 1, 2j + 1)
+    visited = bytearray(height * width)
+    opened_rows, opened_cols = [], []
+    stack = [rng.randrange(height * width)]
+    visited[stack[0]] = 1
+    while stack:
+        cell = stack[-1]
+        i, j = divmod(cell, width)
+        options = []
+        if i > 0 and not visited[cell - width]:
+            options.append(cell - width)
+        if i < height - 1 and not visited[cell + width]:
+            options.append(cell + width)
+        if j > 0 and not visited[cell - 1]:
+            options.append(cell - 1)
+        if j < width - 1 and not visited[cell + 1]:
+            options.append(cell + 1)
+        if not options:
+            stack.pop()
+            continue
+
+        nxt = options[rng.randrange(len(options))] if len(options) > 1 else options[0]
+        visited[nxt] = 1
+        ni, nj = divmod(nxt, width)
+        opened_rows.append(i + ni + 1)  # Wall between the two cells
+        opened_cols.append(j + nj + 1)
+        stack.append(nxt)
+
+    grid[1:2 * height:2, 1:2 * width:2] = 0
+    grid[opened_rows, opened_cols] = 0
+
+    # Braid: inner walls between two maze cells (one odd and one even coordinate)
+    inner = np.zeros_like(grid, dtype=bool)
+    inner[1:2 * height:2, 2:2 * width - 1:2] = True
+    inner[2:2 * height - 1:2, 1:2 * width:2] = True
+    np_rng = np.random.default_rng(rng.randrange(2 ** 32))
+    grid[inner & (grid == 1) & (np_rng.random(grid.shape) < loop_chance)] = 0
+
+    # Special cells on even coordinates: dig to the closest maze cell
+    for r, c in special_cells(rows, cols):
+        target_r = min(r if r % 2 else r - 1, 2 * height - 1)
+        target_c = min(c if c % 2 else c - 1, 2 * width - 1)
+        grid[min(r, target_r):max(r, target_r) + 1, c] = 0
+        grid[target_r, min(c, target_c):max(c, target_c) + 1] = 0
+    return grid
+
+
+def generate_rooms(rows, cols, seed=None, room_size=8, extra_door_chance=0.3):
+    """
+    Rooms of room_size x room_size cells (the last ones take the leftover
+    space) separated by one-cell walls. Doors follow a random spanning tree
+    of the rooms, so all of them are connected, plus extra_door_chance of the
+    other shared walls for alternative routes.
+    """
+    rng = random.Random(seed)
+    grid = np.zeros((rows, cols), dtype=np.uint8)
+    grid[[0, -1], :] = 1
+    grid[:, [0, -1]] = 1
+
+    # Wall lines every room_size + 1 cells, skipping the ones too close to the border
+    row_walls = list(range(room_size + 1, rows - 2, room_size + 1))
+    col_walls = list(range(room_size + 1, cols - 2, room_size + 1))
+    grid[row_walls, :] = 1
+    grid[:, col_walls] = 1
+    row_bounds = [0] + row_walls + [rows - 1]
+    col_bounds = [0] + col_walls + [cols - 1]
+    height, width = len(row_bounds) - 1, len(col_bounds) - 1
+
+    def open_door(i, j, ni, nj):
+        if ni != i:  # Horizontal wall between room (i, j) and room (i + 1, j)
+            grid[row_bounds[i + 1], rng.randrange(col_bounds[j] + 1, col_bounds[j + 1])] = 0
+        else:
+            grid[rng.randrange(row_bounds[i] + 1, row_bounds[i + 1]), col_bounds[j + 1]] = 0
+
+    # Spanning tree of the rooms with a randomized DFS
+    visited = [[False] * width for _ in range(height)]
+    tree = set()
+    stack = [(0, 0)]
+    visited[0][0] = True
+    while stack:
+        i, j = stack[-1]
+        options = [(ni, nj) for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))
+                   if 0 <= ni < height and 0 <= nj < width and not visited[ni][nj]]
+        if not options:
+            stack.pop()
+            continue
+        ni, nj = rng.choice(options)
+        visited[ni][nj] = True
+        tree.add((min(i, ni), min(j, nj), ni != i))
+        open_door(min(i, ni), min(j, nj), max(i, ni), max(j, nj))
+        stack.append((ni, nj))
+
+    for i in range(height):
+        for j in range(width):
+            for down in (True, False):
+                ni, nj = (i + 1, j) if down else (i, j + 1)
+                if ni < height and nj < width and (i, j, down) not in tree and rng.random() < extra_door_chance:
+                    open_door(i, j, ni, nj)
+
+    for r, c in special_cells(rows, cols):
+        grid[r, c] = 0
+    return keep_connected(grid, (rows // 2, cols // 2))
+
+
+def generate_open_field(rows, cols, seed=None, density=0.2):
+    """Scattered obstacles covering about density of the inner cells; pockets they seal off are filled."""
+    np_rng = np.random.default_rng(seed)
+    grid = (np_rng.random((rows, cols)) < density).astype(np.uint8)
+    grid[[0, -1], :] = 1
+    grid[:, [0, -1]] = 1
+    for r, c in special_cells(rows, cols):
+        grid[r, c] = 0
+    return keep_connected(grid, (rows // 2, cols // 2))
+
+
+def reachable_from(grid, start):
+    """Boolean mask of the free cells connected to start (frontier BFS on flat indices, border must be wall)."""
+    rows, cols = grid.shape
+    free = grid.ravel() == 0
+    reached = np.zeros(rows * cols, dtype=bool)
+    frontier = np.array([start[0] * cols + start[1]])
+    reached[frontier] = True
+    while frontier.size:
+        candidates = np.concatenate((frontier - cols, frontier + cols, frontier - 1, frontier + 1))
+        candidates = np.unique(candidates[free[candidates] & ~reached[candidates]])
+        reached[candidates] = True
+        frontier = candidates
+    return reached.reshape(rows, cols)
+
+
+def keep_connected(grid, center):
+    """
+    Fill the free cells not connected to center, after digging straight
+    corridors from the special cells to the connected area.
+    """
+    rows, cols = grid.shape
+    reached = reachable_from(grid, center)
+    for r, c in special_cells(rows, cols):
+        if reached[r, c]:
+            continue
+        # Walk towards the center (rows first, then columns) until the connected area
+        while not reached[r, c]:
+            grid[r, c] = 0
+            if r != center[0]:
+                r += 1 if center[0] > r else -1
+            else:
+                c += 1 if center[1] > c else -1
+        reached = reachable_from(grid, center)
+
+    grid[~reached] = 1
+    return grid
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from environment.maps import MAPS_DIRECTORY, save_map
+
+    # Example maps for scaling experiments, written to assets/maps
+    for kind in MAP_KINDS:
+        for size in (17, 65, 257, 1025):
+            path = os.path.join(MAPS_DIRECTORY, "generated", f"{kind}_{size}.map")
+            save_map(generate_map(kind, size, size, seed=0), path)
+            print(f"Saved {path}")
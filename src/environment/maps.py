@@ -0,0 +1,59 @@
+import os
+import numpy as np
+
+MAPS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "maps")
+MAP_EXTENSION = ".map"
+
+# '#' is the game's wall; '@', 'O', 'T' and 'W' are the blocked terrains of the
+# Moving AI benchmark maps, so those files load too. Every other character is floor.
+WALL_CHARACTERS = "#@OTW"
+
+_WALL_LOOKUP = np.zeros(256, dtype=np.uint8)
+_WALL_LOOKUP[np.frombuffer(WALL_CHARACTERS.encode(), dtype=np.uint8)] = 1
+
+
+def grid_from_rows(rows):
+    """uint8 grid (1 = wall) from equal-length strings, parsed in one numpy pass."""
+    if not rows:
+        raise ValueError("Empty map")
+    width = len(rows[0])
+    if any(len(row) != width for row in rows):
+        raise ValueError("All map rows must have the same length")
+
+    characters = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+    return _WALL_LOOKUP[characters].reshape(len(rows), width)
+
+
+def parse_map(text):
+    """
+    Map file contents -> uint8 grid. One row per line; blank lines are ignored.
+    A Moving AI header ("type ...", "height ...", "width ...", "map") is skipped.
+    """
+    lines = [line.rstrip("\r") for line in text.split("\n")]
+    if lines and lines[0].startswith("type"):
+        lines = lines[lines.index("map") + 1:]
+    return grid_from_rows([line for line in lines if line])
+
+
+def format_map(grid):
+    """uint8 grid -> map file contents."""
+    characters = np.where(np.asarray(grid) != 0, ord("#"), ord(".")).astype(np.uint8)
+    return "\n".join(row.tobytes().decode("ascii") for row in characters) + "\n"
+
+
+def map_path(name):
+    """Path of a map: an existing file path, or the name of a map in assets/maps."""
+    if os.path.exists(name):
+        return name
+    return os.path.join(MAPS_DIRECTORY, name if name.endswith(MAP_EXTENSION) else name + MAP_EXTENSION)
+
+
+def load_map(name):
+    with open(map_path(name)) as map_file:
+        return parse_map(map_file.read())
+
+
+def save_map(grid, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as map_file:
+        map_file.write(format_map(grid))
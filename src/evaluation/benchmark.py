@@ -3,54 +3,116 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from environment.grid import GridEnvironment
+from environment.maps import load_map
 from agents.catcher import Catcher
 from agents.runner import Runner
 from game.simulator import GameSimulator
-import numpy as np
-import json
+from evaluation.streaming_stats import ExperimentStats, wilson_interval
+from evaluation.results_store import DEFAULT_DIRECTORY, ResultsStore, experiment_config, game_metrics
+from algorithms.parallel_search import shutdown_pools
+import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+# Map of the experiment, set once per worker process by init_worker
+_worker_map_data = None
+
+
+def play_game(map_data, max_turns, catcher_strategy, runner_strategy, seed):
+    """
+    One benchmark game, with spawns, teleports and random moves drawn from its own
+    random.Random(seed). Returns the GameSimulator metrics plus the seed.
+    """
+    rng = random.Random(seed)
+    env = GridEnvironment(map_data, rng=rng)
+    
+    env.spawn_power_ups(speed_boosts=3, wall_builders=2, ghost_modes=2)
+    env.spawn_teleport()
+    
+    catcher_pos = env.get_random_spawn_position(row_range=(1, 4))
+    runner_pos = env.get_random_spawn_position(row_range=(env.rows - 3, env.rows))
+    
+    catcher = Catcher("catcher", catcher_pos, strategy=catcher_strategy, rng=rng)
+    runner = Runner("runner", runner_pos, strategy=runner_strategy, rng=rng)
+    
+    env.add_agent(catcher.name, catcher.position)
+    env.add_agent(runner.name, runner.position)
+    
+    game = GameSimulator(env, catcher, runner, max_turns=max_turns, verbose=False, lean=True)
+    metrics = game.run()
+    metrics["seed"] = seed
+    return metrics
+
+
+def init_worker(map_data):
+    global _worker_map_data
+    _worker_map_data = map_data
+
+
+def play_game_task(task):
+    """Pool entry point: task = (max_turns, catcher_strategy, runner_strategy, seed)."""
+    try:
+        return play_game(_worker_map_data, *task)
+    finally:
+        shutdown_pools()  # Pool workers exit without running atexit handlers
+
 
 class Benchmark:
     
-    def __init__(self, map_data, max_turns=50):
+    def __init__(self, map_data, max_turns=50, results_dir=None):
+        """results_dir: where every game is saved as it ends (ResultsStore); None saves nothing."""
         self.map_data = map_data
         self.max_turns = max_turns
+        self.results_dir = results_dir
         self.results = []
     
     def run_experiments(self, catcher_strategy, runner_strategy, num_games=100, 
-                       catcher_start=(1, 1), runner_start=(3, 3)):
+                       catcher_start=(1, 1), runner_start=(3, 3), seed=0, workers=1, chunk_size=None):
+        """
+        Play num_games games, game i with seed seed + i (the same results for any number of workers),
+        in a process pool of chunk_size-game chunks when workers > 1, folded into an ExperimentStats as
+        they end. With a results_dir, games go to a ResultsStore too and the seeds it has are not replayed.
+        """
         print(f"\n{'='*60}")
         print(f"Benchmark: Catcher ({catcher_strategy}) vs Runner ({runner_strategy})")
         print(f"Number of games: {num_games}")
         print(f"{'='*60}\n")
         
-        game_results = []
+        stats = ExperimentStats()
+        store = None
+        recorded = ()
+        if self.results_dir is not None:
+            config = experiment_config(GridEnvironment(self.map_data).grid, self.max_turns,
+                                       catcher_strategy, runner_strategy)
+            store = ResultsStore(config, self.results_dir)
+            recorded = store.seeds
+            for record in store.records(seeds=range(seed, seed + num_games)):
+                stats.add_game(game_metrics(record))
+            if stats.games:
+                print(f"Resuming: {stats.games}/{num_games} games already in {store.path}")
         
-        for i in range(num_games):
-            env = GridEnvironment(self.map_data)
-            
-            env.spawn_power_ups(speed_boosts=3, wall_builders=2, ghost_modes=2)
-            env.spawn_teleport()
-            
-            catcher_pos = env.get_random_spawn_position(row_range=(1, 4))
-            runner_pos = env.get_random_spawn_position(row_range=(14, 17))
-            
-            catcher = Catcher("catcher", catcher_pos, strategy=catcher_strategy)
-            runner = Runner("runner", runner_pos, strategy=runner_strategy)
-            
-            env.add_agent(catcher.name, catcher.position)
-            env.add_agent(runner.name, runner.position)
-            
-            game = GameSimulator(env, catcher, runner, max_turns=self.max_turns, verbose=False)
-            metrics = game.run()
-            
-            game_results.append(metrics)
-            
-            if (i + 1) % 10 == 0:
-                print(f"Completed {i + 1}/{num_games} games...")
+        tasks = ((self.max_turns, catcher_strategy, runner_strategy, seed + i) for i in range(num_games)
+                 if seed + i not in recorded)
+        remaining = num_games - stats.games
+        
+        try:
+            if workers > 1:
+                if chunk_size is None:
+                    chunk_size = max(1, remaining // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                         initargs=(self.map_data,)) as pool:
+                    # map keeps the game order, whichever worker finishes first
+                    for metrics in pool.map(play_game_task, tasks, chunksize=chunk_size):
+                        self.record_game(stats, store, metrics, num_games)
+            else:
+                for task in tasks:
+                    self.record_game(stats, store, play_game(self.map_data, *task), num_games)
+        finally:
+            shutdown_pools()  # Minimax search pools of this experiment
+            if store is not None:
+                store.close()
         
-        analysis = self.analyze_results(game_results, catcher_strategy, runner_strategy)
+        analysis = self.analyze_results(stats, catcher_strategy, runner_strategy)
         
         experiment = {
             "timestamp": datetime.now().isoformat(),
@@ -58,7 +120,8 @@ class Benchmark:
             "runner_strategy": runner_strategy,
             "num_games": num_games,
             "max_turns": self.max_turns,
-            "raw_results": game_results,
+            "seed": seed,
+            "results_path": store.path if store is not None else None,
             "analysis": analysis
         }
         
@@ -68,40 +131,63 @@ class Benchmark:
         
         return analysis
     
-    def analyze_results(self, game_results, catcher_strategy, runner_strategy):
-        catcher_wins = sum(1 for g in game_results if g["winner"] == "catcher")
-        runner_wins = sum(1 for g in game_results if g["winner"] == "runner")
-        
-        capture_turns = [g["turns"] for g in game_results if g["winner"] == "catcher"]
-        
-        catcher_times_flat = [t for g in game_results for t in g["catcher_times"]]
-        runner_times_flat = [t for g in game_results for t in g["runner_times"]]
-        total_times = [g["total_time"] for g in game_results]
+    def record_game(self, stats, store, metrics, num_games):
+        stats.add_game(metrics)
+        if store is not None:
+            store.append(metrics["seed"], metrics)
+        if stats.games % 10 == 0:
+            print(f"Completed {stats.games}/{num_games} games...")
+    
+    def analyze_results(self, stats, catcher_strategy, runner_strategy):
+        """Summary of an ExperimentStats (times in ms, rates in %)."""
+        games = stats.games
+        capture_turns = stats.capture_turns
+        catcher_ci = wilson_interval(stats.catcher_wins, games)
         
         analysis = {
             "catcher_strategy": catcher_strategy,
             "runner_strategy": runner_strategy,
-            "total_games": len(game_results),
+            "total_games": games,
             
-            "catcher_wins": catcher_wins,
-            "runner_wins": runner_wins,
-            "catcher_win_rate": catcher_wins / len(game_results) * 100,
-            "runner_win_rate": runner_wins / len(game_results) * 100,
+            "catcher_wins": stats.catcher_wins,
+            "runner_wins": stats.runner_wins,
+            "catcher_win_rate": stats.catcher_wins / games * 100,
+            "runner_win_rate": stats.runner_wins / games * 100,
+            # 95% Wilson intervals
+            "catcher_win_rate_ci": (catcher_ci[0] * 100, catcher_ci[1] * 100),
+            "runner_win_rate_ci": tuple(x * 100 for x in wilson_interval(stats.runner_wins, games)),
             
-            "avg_capture_turns": np.mean(capture_turns) if capture_turns else None,
-            "min_capture_turns": np.min(capture_turns) if capture_turns else None,
-            "max_capture_turns": np.max(capture_turns) if capture_turns else None,
-            "std_capture_turns": np.std(capture_turns) if capture_turns else None,
+            "avg_capture_turns": capture_turns.mean if capture_turns.count else None,
+            "min_capture_turns": capture_turns.minimum,
+            "max_capture_turns": capture_turns.maximum,
+            "std_capture_turns": capture_turns.std() if capture_turns.count else None,
             
-            "avg_catcher_time_per_move_ms": np.mean(catcher_times_flat) * 1000,
-            "avg_runner_time_per_move_ms": np.mean(runner_times_flat) * 1000,
-            "avg_total_game_time_s": np.mean(total_times),
-            "max_total_game_time_s": np.max(total_times),
+            "avg_catcher_time_per_move_ms": stats.time_per_move_ns("catcher") / 1e6,
+            "avg_runner_time_per_move_ms": stats.time_per_move_ns("runner") / 1e6,
+            "avg_total_game_time_s": stats.game_time.mean,
+            "max_total_game_time_s": stats.game_time.maximum,
             
-            "avg_steps_per_game": np.mean([g["turns"] for g in game_results]),
-            "std_steps_per_game": np.std([g["turns"] for g in game_results])
+            "avg_steps_per_game": stats.turns.mean,
+            "std_steps_per_game": stats.turns.std()
         }
         
+        for side in ExperimentStats.SIDES:
+            # Tail latency of single moves
+            for p in (50, 95, 99):
+                value = stats.latency[side].percentile(p)
+                analysis[f"{side}_p{p}_time_per_move_ms"] = value / 1e6 if value is not None else None
+            
+            # Search counters summed over all games, and per move
+            moves = stats.moves[side]
+            move_time = stats.time_per_move_ns(side) * moves / 1e9  # Estimated from the timed moves
+            totals = dict(stats.search_stats[side])
+            
+            analysis[f"{side}_search_stats"] = totals
+            analysis[f"{side}_search_per_move"] = {field: (value / moves if moves else 0)
+                                                   for field, value in totals.items()}
+            analysis[f"{side}_distance_time_pct"] = (totals["distance_time"] / move_time * 100
+                                                     if move_time else 0)
+        
         return analysis
     
     def print_analysis(self, analysis):
@@ -115,6 +201,7 @@ class Benchmark:
         print(f"📊 WIN RATE:")
         print(f"  Catcher: {analysis['catcher_wins']}/{analysis['total_games']} ({analysis['catcher_win_rate']:.1f}%)")
         print(f"  Runner:  {analysis['runner_wins']}/{analysis['total_games']} ({analysis['runner_win_rate']:.1f}%)")
+        print(f"  Catcher 95% CI: {analysis['catcher_win_rate_ci'][0]:.1f}% - {analysis['catcher_win_rate_ci'][1]:.1f}%")
         print()
         
         if analysis['avg_capture_turns']:
@@ -130,6 +217,22 @@ class Benchmark:
         print(f"  Avg Runner time per move:  {analysis['avg_runner_time_per_move_ms']:.4f} ms")
         print(f"  Avg game time:             {analysis['avg_total_game_time_s']:.4f} s")
         print(f"  Max game time:             {analysis['max_total_game_time_s']:.4f} s")
+        for side in ["catcher", "runner"]:
+            if analysis[f"{side}_p50_time_per_move_ms"] is not None:
+                print(f"  {side.capitalize():7} p50/p95/p99:       {analysis[f'{side}_p50_time_per_move_ms']:.4f} / "
+                      f"{analysis[f'{side}_p95_time_per_move_ms']:.4f} / {analysis[f'{side}_p99_time_per_move_ms']:.4f} ms")
+        print()
+        
+        print(f"🔎 SEARCH (per move):")
+        for side in ["catcher", "runner"]:
+            per_move = analysis[f"{side}_search_per_move"]
+            if not per_move["nodes_expanded"] and not per_move["distance_calls"]:
+                continue
+            print(f"  {side.capitalize()}: {per_move['nodes_expanded']:.1f} nodes, "
+                  f"{per_move['leaf_evaluations']:.1f} leaf evals, "
+                  f"{per_move['cutoffs']:.1f} cutoffs, {per_move['cache_hits']:.1f} cache hits")
+            print(f"    {per_move['distance_calls']:.1f} distance calls "
+                  f"({analysis[f'{side}_distance_time_pct']:.1f}% of move time)")
         print()
         
         print(f"📈 STEPS PER EPISODE:")
@@ -138,27 +241,9 @@ class Benchmark:
 
 
 if __name__ == "__main__":
-    map_data = [
-    "#################",
-    "#...............#",
-    "#.#####...#.#...#",
-    "#.#.......#.#...#",
-    "#.#.###.###.###.#",
-    "#.#.#...........#",
-    "#.#.#...###.###.#",
-    "#.........#.#...#",
-    "#...###...#.#...#",
-    "#...###.........#",
-    "#...###...#######",
-    "#.........#.....#",
-    "#.#...#.#.#...#.#",
-    "#.#...#.#.#...#.#",
-    "#.#####.#.....#.#",
-    "#.......#.....#.#",
-    "#################"
-]
+    map_data = load_map("classic")
     
-    benchmark = Benchmark(map_data, max_turns=50)
+    benchmark = Benchmark(map_data, max_turns=50, results_dir=DEFAULT_DIRECTORY)
     
-    benchmark.run_experiments("minimax", "minimax", num_games=10)
+    benchmark.run_experiments("minimax", "minimax", num_games=10, workers=os.cpu_count())
     
\ No newline at end of file
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import numpy as np
+from algorithms.search_stats import SearchStats
+from algorithms.tablebase import grid_signature
+from evaluation.streaming_stats import ExperimentStats, LatencyHistogram
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "results")
+
+SIDES = ExperimentStats.SIDES
+SIDE_FIELDS = ["moves", "timed_moves", "time_ns", "nodes_explored"]
+
+
+def experiment_config(grid, max_turns, catcher_strategy, runner_strategy):
+    """What identifies an experiment: games of the same config and seed are the same game."""
+    return {
+        "map": grid_signature(grid),
+        "max_turns": max_turns,
+        "catcher_strategy": catcher_strategy,
+        "runner_strategy": runner_strategy,
+    }
+
+
+def config_key(config):
+    digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{config['catcher_strategy']}_vs_{config['runner_strategy']}_{digest}"
+
+
+def game_record(seed, metrics):
+    """JSON-friendly copy of the GameSimulator metrics of one game."""
+    record = {
+        "seed": seed,
+        "winner": metrics["winner"],
+        "turns": metrics["turns"],
+        "total_time": metrics["total_time"],
+    }
+    for side in SIDES:
+        for field in SIDE_FIELDS:
+            record[f"{side}_{field}"] = metrics[f"{side}_{field}"]
+        record[f"{side}_search_stats"] = metrics[f"{side}_search_stats"]
+        record[f"{side}_latency"] = {str(index): count for index, count in metrics[f"{side}_latency"].counts.items()}
+    return record
+
+
+def game_metrics(record):
+    """Back from game_record: metrics that ExperimentStats.add_game accepts."""
+    metrics = dict(record)
+    for side in SIDES:
+        latency = LatencyHistogram()
+        for index, count in record[f"{side}_latency"].items():
+            latency.counts[int(index)] = count
+            latency.count += count
+        metrics[f"{side}_latency"] = latency
+    return metrics
+
+
+class ResultsStore:
+    """
+    Append-only results of one experiment config in directory/<config key>: games.jsonl, one line
+    per game flushed as it ends (its seeds are skipped on a rerun), and shard_NNNNN.npz, the same
+    games in numpy columns, shard_size per file. A line cut by a crash is dropped on reopening.
+    """
+
+    def __init__(self, config, directory=DEFAULT_DIRECTORY, shard_size=1000):
+        self.config = config
+        self.shard_size = shard_size
+        self.path = os.path.join(directory, config_key(config))
+        os.makedirs(self.path, exist_ok=True)
+
+        config_path = os.path.join(self.path, "config.json")
+        if not os.path.exists(config_path):
+            with open(config_path, "w") as f:
+                json.dump(config, f, indent=2, sort_keys=True)
+
+        self.log_path = os.path.join(self.path, "games.jsonl")
+        self.repair_log()
+
+        sharded = set()
+        for path in self.shard_paths():
+            with np.load(path) as shard:
+                sharded.update(shard["seed"].tolist())
+        self.shard_count = len(self.shard_paths())
+
+        self.seeds = set()
+        self.pending = []  # Logged games not in a shard yet
+        for record in self.records():
+            self.seeds.add(record["seed"])
+            if record["seed"] not in sharded:
+                self.pending.append(record)
+        self.log = open(self.log_path, "a")
+
+    def repair_log(self):
+        """Cut a last line left incomplete by an interrupted run."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def shard_paths(self):
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                      if name.startswith("shard_") and name.endswith(".npz"))
+
+    def records(self, seeds=None):
+        """Game records in the log, in the order they were written (only the given seeds, if any)."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path) as f:
+            for line in f:
+                record = json.loads(line)
+                if seeds is None or record["seed"] in seeds:
+                    yield record
+
+    def append(self, seed, metrics):
+        record = game_record(seed, metrics)
+        self.log.write(json.dumps(record) + "\n")
+        self.log.flush()
+        self.seeds.add(seed)
+        self.pending.append(record)
+        if len(self.pending) >= self.shard_size:
+            self.write_shard()
+
+    def write_shard(self):
+        if not self.pending:
+            return
+        records = self.pending
+        columns = {
+            "seed": np.array([r["seed"] for r in records], dtype=np.int64),
+            "catcher_won": np.array([r["winner"] == "catcher" for r in records]),
+            "turns": np.array([r["turns"] for r in records], dtype=np.int32),
+            "total_time": np.array([r["total_time"] for r in records]),
+        }
+        for side in SIDES:
+            for field in SIDE_FIELDS:
+                columns[f"{side}_{field}"] = np.array([r[f"{side}_{field}"] for r in records], dtype=np.int64)
+            for field in SearchStats.FIELDS:
+                columns[f"{side}_{field}"] = np.array([r[f"{side}_search_stats"][field] for r in records])
+
+            # Histogram of game i: buckets/counts[offsets[i]:offsets[i + 1]]
+            latencies = [r[f"{side}_latency"] for r in records]
+            columns[f"{side}_latency_offsets"] = np.cumsum([0] + [len(h) for h in latencies], dtype=np.int64)
+            columns[f"{side}_latency_buckets"] = np.array([int(i) for h in latencies for i in h], dtype=np.int32)
+            columns[f"{side}_latency_counts"] = np.array([c for h in latencies for c in h.values()], dtype=np.int64)
+
+        # Written under a temporary name, so a shard is either complete or missing
+        path = os.path.join(self.path, f"shard_{self.shard_count:05d}.npz")
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **columns)
+        os.replace(path + ".tmp", path)
+        self.shard_count += 1
+        self.pending = []
+
+    def columns(self):
+        """Per-game columns of every shard, concatenated (latency CSR arrays left out)."""
+        shards = []
+        for path in self.shard_paths():
+            with np.load(path) as shard:
+                shards.append({name: shard[name] for name in shard.files if "_latency_" not in name})
+        if not shards:
+            return {}
+        return {name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]}
+
+    def close(self):
+        """Write the last, partial shard and close the log."""
+        self.write_shard()
+        self.log.close()
@@ -0,0 +1,172 @@
+import math
+from algorithms.search_stats import SearchStats
+
+
+class RunningStats:
+    """Count, mean, variance (Welford), min and max of a stream of values, in constant memory."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """Fold in the stats of another stream (Chan et al. pairwise update)."""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def variance(self):
+        """Population variance (like np.var), 0 for fewer than two values."""
+        return self.m2 / self.count if self.count > 1 else 0.0
+
+    def std(self):
+        return math.sqrt(self.variance())
+
+
+class LatencyHistogram:
+    """
+    Durations in ns counted in log-linear buckets: one per value below 2 * SUB_BUCKETS, then every
+    power of two split in SUB_BUCKETS, so a percentile is off by at most 1 / SUB_BUCKETS (6%) of its
+    value. Only the buckets in use are stored.
+    """
+
+    SUB_BITS = 4
+    SUB_BUCKETS = 1 << SUB_BITS
+
+    def __init__(self):
+        self.counts = {}  # Bucket index -> number of values
+        self.count = 0
+
+    @classmethod
+    def bucket(cls, ns):
+        if ns < 2 * cls.SUB_BUCKETS:
+            return max(ns, 0)
+        shift = ns.bit_length() - 1 - cls.SUB_BITS
+        return shift * cls.SUB_BUCKETS + (ns >> shift)
+
+    @classmethod
+    def bucket_bounds(cls, index):
+        """(lowest, highest) ns value of a bucket."""
+        if index < 2 * cls.SUB_BUCKETS:
+            return index, index
+        shift, mantissa = divmod(index, cls.SUB_BUCKETS)
+        shift -= 1
+        mantissa += cls.SUB_BUCKETS
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def add(self, ns):
+        index = self.bucket(ns)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+
+    def percentile(self, p):
+        """Value (ns, middle of its bucket) below which p percent of the durations fall, None if empty."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return (low + high) / 2
+        return None
+
+
+def wilson_interval(successes, total, z=1.96):
+    """Wilson score interval of a success rate (95% by default), as (low, high) fractions."""
+    if not total:
+        return 0.0, 1.0
+    rate = successes / total
+    denominator = 1 + z * z / total
+    center = (rate + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class ExperimentStats:
+    """
+    Everything Benchmark.analyze_results needs, folded in one game at a time (add_game takes
+    GameSimulator metrics), so memory does not grow with the number of games.
+    """
+
+    SIDES = ["catcher", "runner"]
+
+    def __init__(self):
+        self.games = 0
+        self.catcher_wins = 0
+        self.runner_wins = 0
+        self.capture_turns = RunningStats()
+        self.turns = RunningStats()
+        self.game_time = RunningStats()
+        self.moves = {side: 0 for side in self.SIDES}
+        self.timed_moves = {side: 0 for side in self.SIDES}
+        self.time_ns = {side: 0 for side in self.SIDES}
+        self.latency = {side: LatencyHistogram() for side in self.SIDES}
+        self.search_stats = {side: {field: 0 for field in SearchStats.FIELDS} for side in self.SIDES}
+
+    def add_game(self, metrics):
+        self.games += 1
+        if metrics["winner"] == "catcher":
+            self.catcher_wins += 1
+            self.capture_turns.add(metrics["turns"])
+        elif metrics["winner"] == "runner":
+            self.runner_wins += 1
+        self.turns.add(metrics["turns"])
+        self.game_time.add(metrics["total_time"])
+
+        for side in self.SIDES:
+            self.moves[side] += metrics[f"{side}_moves"]
+            self.timed_moves[side] += metrics[f"{side}_timed_moves"]
+            self.time_ns[side] += metrics[f"{side}_time_ns"]
+            self.latency[side].merge(metrics[f"{side}_latency"])
+            totals = self.search_stats[side]
+            for field, value in metrics[f"{side}_search_stats"].items():
+                totals[field] += value
+
+    def merge(self, other):
+        self.games += other.games
+        self.catcher_wins += other.catcher_wins
+        self.runner_wins += other.runner_wins
+        self.capture_turns.merge(other.capture_turns)
+        self.turns.merge(other.turns)
+        self.game_time.merge(other.game_time)
+        for side in self.SIDES:
+            self.moves[side] += other.moves[side]
+            self.timed_moves[side] += other.timed_moves[side]
+            self.time_ns[side] += other.time_ns[side]
+            self.latency[side].merge(other.latency[side])
+            for field, value in other.search_stats[side].items():
+                self.search_stats[side][field] += value
+
+    def time_per_move_ns(self, side):
+        """Mean time of the timed moves of one side."""
+        return self.time_ns[side] / self.timed_moves[side] if self.timed_moves[side] else 0.0
@@ -0,0 +1,230 @@
+import numpy as np
+from algorithms.astar import AStar
+from algorithms.distance_oracle import DistanceOracle
+from environment.grid import DIRECTION_CODES, GridEnvironment, SPEED_BOOST, WALL_BUILDER, GHOST_MODE, TELEPORT, SPEED_BOOST_TURNS
+
+CATCHER_STRATEGIES = ["astar", "random"]
+RUNNER_STRATEGIES = ["greedy", "random"]
+
+UNKNOWN_STEP = -1
+NO_STEP = 4  # AStar found no path
+
+
+class BatchSimulator:
+    """
+    Many games on one map in lockstep: every game is a row of numpy arrays and each step plays one
+    turn of all the running games, with GameSimulator's rules and Benchmark's spawns. Only strategies
+    that never use items are supported (walls never change): Catcher "astar" (AStar's first step,
+    cached per position pair) and Runner "greedy" or "random". Random draws come from a numpy Generator.
+    """
+
+    def __init__(self, map_data, catcher_strategy="astar", runner_strategy="greedy", max_turns=50, seed=None,
+                 speed_boosts=3, wall_builders=2, ghost_modes=2, catcher_rows=(1, 4), runner_rows=None):
+        if catcher_strategy not in CATCHER_STRATEGIES or runner_strategy not in RUNNER_STRATEGIES:
+            raise ValueError(f"Batch games support Catcher {CATCHER_STRATEGIES} and Runner {RUNNER_STRATEGIES}")
+        env = GridEnvironment(map_data)
+        if not DistanceOracle.fits(env):
+            raise ValueError(f"Map too large for batch games (max {DistanceOracle.MAX_CELLS} free cells)")
+
+        self.catcher_strategy = catcher_strategy
+        self.runner_strategy = runner_strategy
+        self.max_turns = max_turns
+        self.rng = np.random.default_rng(seed)
+
+        oracle = DistanceOracle(env)
+        self.positions = oracle.positions
+        n = len(oracle.positions)
+        self.astar = AStar(env)
+        self.first_steps = np.full((n, n), UNKNOWN_STEP, dtype=np.int8)  # [catcher, runner] -> direction code
+        self.neighbors = oracle.neighbor_table  # (n, 4) in up/down/left/right order, n = no neighbor
+        self.valid = self.neighbors < n
+        self.safe_neighbors = np.where(self.valid, self.neighbors, 0)  # For gathers, masked by valid
+        self.cell_rows = np.array([pos[0] for pos in oracle.positions])
+        self.cell_cols = np.array([pos[1] for pos in oracle.positions])
+
+        # Power-up slots: types in spawn_power_ups order, then the teleport
+        self.slot_types = np.array([SPEED_BOOST] * speed_boosts + [WALL_BUILDER] * wall_builders +
+                                   [GHOST_MODE] * ghost_modes + [TELEPORT])
+        center = (env.rows // 2, env.cols // 2)
+        self.center = oracle.index.get(center, -1)  # A teleport inside a wall can never be picked up
+        if any(corner not in oracle.index for corner in env.teleport_corners):
+            raise ValueError("Batch games need free teleport corners")
+        self.corners = np.array([oracle.index[corner] for corner in env.teleport_corners])
+
+        if runner_rows is None:
+            runner_rows = (env.rows - 3, env.rows)
+        self.catcher_cells = np.flatnonzero((self.cell_rows >= catcher_rows[0]) & (self.cell_rows < catcher_rows[1]))
+        self.runner_cells = np.flatnonzero((self.cell_rows >= runner_rows[0]) & (self.cell_rows < runner_rows[1]))
+        if not len(self.catcher_cells) or not len(self.runner_cells):
+            raise ValueError("No free cells available!")
+
+    def sample_distinct(self, count, k, n):
+        """count rows of k distinct cells out of n, each an ordered uniform sample."""
+        chosen = np.empty((count, k), dtype=np.int64)
+        for j in range(k):
+            draw = self.rng.integers(0, n - j, size=count)
+            # Skip the cells already taken: walk the sorted ones, shifting past each
+            for taken in np.sort(chosen[:, :j], axis=1).T:
+                draw += draw >= taken
+            chosen[:, j] = draw
+        return chosen
+
+    def reset(self, num_games):
+        """Spawn num_games new games."""
+        n = len(self.cell_rows)
+        spawned = len(self.slot_types) - 1
+        if n < spawned:
+            raise ValueError("Not enough free cells for the power-ups")
+
+        self.power_up_cells = np.empty((num_games, len(self.slot_types)), dtype=np.int64)
+        self.power_up_cells[:, :spawned] = self.sample_distinct(num_games, spawned, n)
+        self.power_up_cells[:, spawned] = self.center
+        # spawn_teleport replaces a power-up spawned on the center
+        self.power_ups = self.power_up_cells >= 0
+        self.power_ups[:, :spawned] &= self.power_up_cells[:, :spawned] != self.center
+
+        self.catcher = self.catcher_cells[self.rng.integers(0, len(self.catcher_cells), size=num_games)]
+        self.runner = self.runner_cells[self.rng.integers(0, len(self.runner_cells), size=num_games)]
+        self.catcher_boost = np.zeros(num_games, dtype=np.int8)
+        self.runner_boost = np.zeros(num_games, dtype=np.int8)
+        self.catcher_items = np.zeros((num_games, 2), dtype=np.int16)  # wall_builder, ghost_mode
+        self.runner_items = np.zeros((num_games, 2), dtype=np.int16)
+
+        self.active = np.ones(num_games, dtype=bool)
+        self.catcher_won = np.zeros(num_games, dtype=bool)
+        self.turns = np.zeros(num_games, dtype=np.int32)
+        self.turn = 0
+
+    def random_moves(self, cells):
+        """A uniformly random valid neighbor of each cell (the cell itself when there is none)."""
+        valid = self.valid[cells]
+        keys = np.where(valid, self.rng.random(valid.shape), -1.0)
+        choice = keys.argmax(axis=1)
+        moved = self.neighbors[cells, choice]
+        return np.where(valid.any(axis=1), moved, cells)
+
+    def catcher_moves(self, games):
+        catcher, runner = self.catcher[games], self.runner[games]
+        if self.catcher_strategy == "random":
+            return self.random_moves(catcher)
+
+        steps = self.first_steps[catcher, runner]
+        missing = steps == UNKNOWN_STEP
+        if missing.any():
+            for c, r in np.unique(np.stack([catcher[missing], runner[missing]], axis=1), axis=0):
+                self.first_steps[c, r] = self.astar_step(c, r)
+            steps = self.first_steps[catcher, runner]
+
+        reachable = steps != NO_STEP
+        moved = self.neighbors[catcher, np.where(reachable, steps, 0)]
+        if reachable.all():
+            return moved
+        return np.where(reachable, moved, self.random_moves(catcher))
+
+    def astar_step(self, catcher, runner):
+        """Direction code of the move AStar plays from cell catcher towards cell runner, or NO_STEP."""
+        action = self.astar.get_next_action(self.positions[catcher], self.positions[runner])
+        return NO_STEP if action is None else DIRECTION_CODES[action]
+
+    def runner_moves(self, games):
+        catcher, runner = self.catcher[games], self.runner[games]
+        if self.runner_strategy == "random":
+            return self.random_moves(runner)
+
+        # Farthest (Manhattan) valid move from the Catcher, first one on ties
+        neighbors = self.safe_neighbors[runner]
+        distance = (np.abs(self.cell_rows[neighbors] - self.cell_rows[catcher][:, None]) +
+                    np.abs(self.cell_cols[neighbors] - self.cell_cols[catcher][:, None]))
+        distance = np.where(self.valid[runner], distance, -1)
+        moved = self.neighbors[runner, distance.argmax(axis=1)]
+        return np.where(self.valid[runner].any(axis=1), moved, runner)
+
+    def collect_power_ups(self, games, is_catcher):
+        cells = self.catcher[games] if is_catcher else self.runner[games]
+        hits = (self.power_up_cells[games] == cells[:, None]) & self.power_ups[games]
+        picked = hits.any(axis=1)
+        if not picked.any():
+            return
+
+        games, slots = games[picked], hits[picked].argmax(axis=1)
+        types = self.slot_types[slots]
+        kept = types == TELEPORT  # The teleport stays on the map
+        self.power_ups[games[~kept], slots[~kept]] = False
+
+        boost = self.catcher_boost if is_catcher else self.runner_boost
+        items = self.catcher_items if is_catcher else self.runner_items
+        boost[games[types == SPEED_BOOST]] = SPEED_BOOST_TURNS
+        np.add.at(items, (games[types == WALL_BUILDER], 0), 1)
+        np.add.at(items, (games[types == GHOST_MODE], 1), 1)
+
+        teleported = games[kept]
+        if len(teleported):
+            # A random corner not occupied by an agent (GridEnvironment.teleport_agent)
+            corners = self.corners[None, :]
+            free = ((corners != self.catcher[teleported][:, None]) & (corners != self.runner[teleported][:, None]))
+            keys = np.where(free, self.rng.random(free.shape), -1.0)
+            targets = np.where(free.any(axis=1), self.corners[keys.argmax(axis=1)],
+                               self.catcher[teleported] if is_catcher else self.runner[teleported])
+            if is_catcher:
+                self.catcher[teleported] = targets
+            else:
+                self.runner[teleported] = targets
+
+    def check_captures(self, games):
+        row_diff = np.abs(self.cell_rows[self.catcher[games]] - self.cell_rows[self.runner[games]])
+        col_diff = np.abs(self.cell_cols[self.catcher[games]] - self.cell_cols[self.runner[games]])
+        captured = ((row_diff == 0) & (col_diff == 0)) | ((row_diff == 1) & (col_diff == 1))
+        caught = games[captured]
+        self.active[caught] = False
+        self.catcher_won[caught] = True
+        self.turns[caught] = self.turn + 1
+
+    def play_turn(self, is_catcher):
+        boost = self.catcher_boost if is_catcher else self.runner_boost
+        games = np.flatnonzero(self.active)
+        moves = np.where(boost[games] > 0, 2, 1)  # Fixed at the start of the turn
+
+        for move_num in range(2):
+            movers = games[(moves > move_num) & self.active[games]]
+            if not len(movers):
+                break
+            if is_catcher:
+                self.catcher[movers] = self.catcher_moves(movers)
+            else:
+                self.runner[movers] = self.runner_moves(movers)
+            self.collect_power_ups(movers, is_catcher)
+            self.check_captures(movers)
+
+        games = games[self.active[games]]
+        boost[games] = np.maximum(boost[games] - 1, 0)
+
+    def step(self):
+        """One turn (Catcher then Runner) of every running game."""
+        self.play_turn(is_catcher=True)
+        self.play_turn(is_catcher=False)
+        self.turn += 1
+        if self.turn >= self.max_turns:
+            self.turns[self.active] = self.max_turns
+            self.active[:] = False
+
+    def run(self, num_games, batch_size=100000):
+        """
+        Play num_games games, batch_size at a time. Returns per-game arrays
+        ("catcher_won", "turns") and the win counts.
+        """
+        catcher_won, turns = [], []
+        for start in range(0, num_games, batch_size):
+            self.reset(min(batch_size, num_games - start))
+            while self.active.any():
+                self.step()
+            catcher_won.append(self.catcher_won)
+            turns.append(self.turns)
+
+        catcher_won = np.concatenate(catcher_won) if catcher_won else np.zeros(0, dtype=bool)
+        turns = np.concatenate(turns) if turns else np.zeros(0, dtype=np.int32)
+        return {
+            "catcher_won": catcher_won,
+            "turns": turns,
+            "catcher_wins": int(catcher_won.sum()),
+            "runner_wins": int((~catcher_won).sum()),
+        }
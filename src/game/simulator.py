@@ -1,4 +1,6 @@
 import time
+from algorithms.search_stats import SearchStats
+from evaluation.streaming_stats import LatencyHistogram
 
 class GameSimulator:
     @staticmethod
@@ -19,37 +21,70 @@ class GameSimulator:
         
         return False
     
-    def __init__(self, env, catcher, runner, max_turns=50, verbose=True):
+    def __init__(self, env, catcher, runner, max_turns=50, verbose=True, lean=False, timing_sample=1):
+        """
+        lean: aggregate counters in metrics (moves, timed moves, total ns, latency histogram)
+            instead of the per-move "catcher_times"/"runner_times" lists, for bulk runs
+        timing_sample: time one move in timing_sample per agent with perf_counter_ns (0: no timing)
+        """
         self.env = env
         self.catcher = catcher
         self.runner = runner
+        catcher.opponent = runner
+        runner.opponent = catcher
         self.max_turns = max_turns
         self.verbose = verbose
+        self.lean = lean
+        self.timing_sample = timing_sample
         self.turn = 0
+        # Per side (0 = catcher, 1 = runner)
+        self.moves = [0, 0]
+        self.timed_moves = [0, 0]
+        self.time_ns = [0, 0]
+        self.latency = [LatencyHistogram(), LatencyHistogram()]
         self.metrics = {
             "winner": None,
             "turns": 0,
-            "catcher_times": [],
-            "runner_times": [],
             "total_time": 0,
+            "catcher_moves": 0,
+            "runner_moves": 0,
+            "catcher_timed_moves": 0,
+            "runner_timed_moves": 0,
+            "catcher_time_ns": 0,
+            "runner_time_ns": 0,
+            "catcher_latency": self.latency[0],
+            "runner_latency": self.latency[1],
             "catcher_nodes_explored": 0,
             "runner_nodes_explored": 0,
+            "catcher_search_stats": SearchStats().as_dict(),
+            "runner_search_stats": SearchStats().as_dict(),
         }
-
+        if not lean:
+            self.metrics["catcher_times"] = []
+            self.metrics["runner_times"] = []
+    
     def execute_turn(self, agent, is_catcher=True):
         moves_count = 2 if agent.has_speed_boost() else 1
-        agent_name = "catcher" if is_catcher else "runner"
-        opponent = self.runner if is_catcher else self.catcher
+        side = 0 if is_catcher else 1
+        env = self.env
         
         for move_num in range(moves_count):
-            move_start = time.time()
-            action = agent.choose_action(self.env)
-            move_time = time.time() - move_start
-            
-            if is_catcher:
-                self.metrics["catcher_times"].append(move_time)
+            timed = self.timing_sample and self.moves[side] % self.timing_sample == 0
+            self.moves[side] += 1
+            if timed:
+                move_start = time.perf_counter_ns()
+                action = agent.choose_action(env)
+                move_time = time.perf_counter_ns() - move_start
+                self.timed_moves[side] += 1
+                self.time_ns[side] += move_time
+                self.latency[side].add(move_time)
+                if not self.lean:
+                    self.metrics["catcher_times" if is_catcher else "runner_times"].append(move_time / 1e9)
             else:
-                self.metrics["runner_times"].append(move_time)
+                action = agent.choose_action(env)
+            
+            if agent.search_stats is not None:
+                self.record_search_stats("catcher" if is_catcher else "runner", agent.search_stats)
             
             if action:
                 # Check if action is tuple (direction, use_ghost_mode)
@@ -57,11 +92,11 @@ class GameSimulator:
                 if isinstance(action, tuple):
                     action, use_ghost = action
                 
-                self.env.move_agent(agent.name, action, use_ghost_mode=use_ghost)
-                agent.position = self.env.agents[agent.name]
+                env.move_agent(agent.name, action, use_ghost_mode=use_ghost)
+                agent.position = env.agents[agent.name]
             
-            power_up = self.env.collect_power_up(agent.position)
-            if power_up:
+            if agent.position in env.power_ups:
+                power_up = env.collect_power_up(agent.position)
                 if power_up == "speed_boost":
                     agent.activate_speed_boost()
                 
@@ -72,42 +107,51 @@ class GameSimulator:
                     agent.add_to_inventory("ghost_mode")
                 
                 elif power_up == "teleport":
-                    self.env.teleport_agent(agent.name)
-                    agent.position = self.env.agents[agent.name]
+                    env.teleport_agent(agent.name)
+                    agent.position = env.agents[agent.name]
             
             if self.can_capture(self.catcher.position, self.runner.position):
                 return "catcher_won"
         
         return None
     
+    def record_search_stats(self, agent_name, stats):
+        totals = self.metrics[f"{agent_name}_search_stats"]
+        for field, value in stats.as_dict().items():
+            totals[field] += value
+        self.metrics[f"{agent_name}_nodes_explored"] += stats.nodes_expanded
+    
+    def finish(self, winner, turns, start_time):
+        metrics = self.metrics
+        metrics["winner"] = winner
+        metrics["turns"] = turns
+        metrics["total_time"] = (time.perf_counter_ns() - start_time) / 1e9
+        for side, name in enumerate(("catcher", "runner")):
+            metrics[f"{name}_moves"] = self.moves[side]
+            metrics[f"{name}_timed_moves"] = self.timed_moves[side]
+            metrics[f"{name}_time_ns"] = self.time_ns[side]
+        return metrics
+    
     def run(self):
         """Main game loop"""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
         while self.turn < self.max_turns:
             result = self.execute_turn(self.catcher, is_catcher=True)
             if result == "catcher_won":
-                self.metrics["winner"] = "catcher"
-                self.metrics["turns"] = self.turn + 1
-                self.metrics["total_time"] = time.time() - start_time
-                
                 if self.verbose:
                     print(f"Catcher won in {self.turn+1} turns!")
                     self.env.print_grid()
-                return self.metrics
+                return self.finish("catcher", self.turn + 1, start_time)
             
             self.catcher.decrease_boost_turns()
-
+            
             result = self.execute_turn(self.runner, is_catcher=False)
             if result == "catcher_won":
-                self.metrics["winner"] = "catcher"
-                self.metrics["turns"] = self.turn + 1
-                self.metrics["total_time"] = time.time() - start_time
-                
                 if self.verbose:
                     print(f"Catcher won in {self.turn+1} turns!")
                     self.env.print_grid()
-                return self.metrics
+                return self.finish("catcher", self.turn + 1, start_time)
             
             self.runner.decrease_boost_turns()
             
@@ -117,12 +161,8 @@ class GameSimulator:
                 self.env.print_grid()
             
             self.turn += 1
-
-        self.metrics["winner"] = "runner"
-        self.metrics["turns"] = self.max_turns
-        self.metrics["total_time"] = time.time() - start_time
         
         if self.verbose:
             print("Runner won!")
         
-        return self.metrics
+        return self.finish("runner", self.max_turns, start_time)
@@ -0,0 +1,257 @@
+import random
+from algorithms.transposition import ZobristHasher
+from environment.grid import (DIRECTIONS, DIRECTION_CODES, POWER_UP_CODES, SPEED_BOOST, WALL_BUILDER, GHOST_MODE,
+                              TELEPORT, SPEED_BOOST_TURNS)
+
+CATCHER = 0
+RUNNER = 1
+
+# Action codes: kind * 4 + direction index, plus STAY
+MOVE = 0
+GHOST = 1
+WALL = 2
+STAY = 12
+
+MAX_COUNTER = 15  # Counters above this share a hash key
+
+
+def action_code(kind, direction):
+    return kind * 4 + DIRECTION_CODES[direction]
+
+
+def describe_action(code):
+    """(kind, direction) of an action code; (STAY, None) for STAY."""
+    if code == STAY:
+        return STAY, None
+    return code // 4, DIRECTIONS[code % 4]
+
+
+class GameBoard:
+    """
+    What does not change during a search, shared by its GameStates: the environment, the root's
+    power-ups (indexed for the GameState bitmask, types as integer codes) and the hash keys.
+    """
+
+    def __init__(self, env, zobrist=None, seed=0):
+        self.env = env
+        self.rows, self.cols = env.rows, env.cols
+        self.zobrist = zobrist if zobrist is not None else ZobristHasher(env.rows, env.cols)
+        self.offsets = [-env.cols, env.cols, -1, 1]
+
+        self.power_up_cells = [pos[0] * env.cols + pos[1] for pos in env.power_ups]
+        self.power_up_types = [POWER_UP_CODES[power_type] for power_type in env.power_ups.values()]
+        self.power_up_index = {cell: i for i, cell in enumerate(self.power_up_cells)}
+        self.power_up_keys = [self.zobrist.power_up_keys[power_type][cell]
+                              for cell, power_type in zip(self.power_up_cells, env.power_ups.values())]
+        self.corners = [pos[0] * env.cols + pos[1] for pos in env.teleport_corners]
+
+        # moves_left, boosts and inventories (see GameState.counter_key)
+        rng = random.Random(seed)
+        self.counter_keys = [[rng.getrandbits(64) for _ in range(MAX_COUNTER + 1)] for _ in range(7)]
+
+    def neighbor(self, cell, direction):
+        """Cell one step away in direction (index), or -1 outside the grid."""
+        row, col = divmod(cell, self.cols)
+        if direction == 0:
+            return cell - self.cols if row > 0 else -1
+        if direction == 1:
+            return cell + self.cols if row < self.rows - 1 else -1
+        if direction == 2:
+            return cell - 1 if col > 0 else -1
+        return cell + 1 if col < self.cols - 1 else -1
+
+
+class GameState:
+    """
+    Compact game state for searches with GameSimulator's rules: agent cells, side and moves left,
+    boosts, items, a bitmask of the root's power-ups still on the map and the walls placed in the search.
+    apply/undo push and pop one tuple. key hashes the changes from the root (XOR the root's board hash).
+    Teleports go to the first free corner, where the game picks one at random.
+    """
+
+    __slots__ = ("board", "catcher", "runner", "side", "moves_left", "catcher_boost", "runner_boost",
+                 "catcher_walls", "catcher_ghosts", "runner_walls", "runner_ghosts",
+                 "power_ups", "walls", "key", "history")
+
+    def __init__(self, board, catcher, runner, side=CATCHER, moves_left=None, catcher_boost=0, runner_boost=0,
+                 catcher_walls=0, catcher_ghosts=0, runner_walls=0, runner_ghosts=0, power_ups=None, walls=()):
+        self.board = board
+        self.catcher = catcher
+        self.runner = runner
+        self.side = side
+        self.catcher_boost = catcher_boost
+        self.runner_boost = runner_boost
+        if moves_left is None:
+            moves_left = 2 if (catcher_boost if side == CATCHER else runner_boost) > 0 else 1
+        self.moves_left = moves_left
+        self.catcher_walls = catcher_walls
+        self.catcher_ghosts = catcher_ghosts
+        self.runner_walls = runner_walls
+        self.runner_ghosts = runner_ghosts
+        self.power_ups = (1 << len(board.power_up_cells)) - 1 if power_ups is None else power_ups
+        self.walls = walls
+        self.history = []
+
+        zobrist = board.zobrist
+        self.key = zobrist.catcher_keys[catcher] ^ zobrist.runner_keys[runner] ^ self.counter_key()
+        if side == RUNNER:
+            self.key ^= zobrist.side_key
+        collected = ((1 << len(board.power_up_cells)) - 1) & ~self.power_ups
+        for i, key in enumerate(board.power_up_keys):
+            if collected >> i & 1:
+                self.key ^= key
+        for cell in walls:
+            self.key ^= zobrist.temporary_wall_keys[cell]
+
+    @classmethod
+    def from_env(cls, env, catcher=None, runner=None, catcher_to_move=True, board=None, positions=None):
+        """
+        Root state from the environment and the agents (positions defaults to env's). An agent left
+        out counts as having no items and no boost; a boosted side is at the first move of its turn.
+        """
+        board = board if board is not None else GameBoard(env)
+        cols = env.cols
+        catcher_pos, runner_pos = positions or (env.agents["catcher"], env.agents["runner"])
+        return cls(board, catcher_pos[0] * cols + catcher_pos[1], runner_pos[0] * cols + runner_pos[1],
+                   side=CATCHER if catcher_to_move else RUNNER,
+                   catcher_boost=catcher.speed_boost_turns if catcher else 0,
+                   runner_boost=runner.speed_boost_turns if runner else 0,
+                   catcher_walls=catcher.inventory["wall_builder"] if catcher else 0,
+                   catcher_ghosts=catcher.inventory["ghost_mode"] if catcher else 0,
+                   runner_walls=runner.inventory["wall_builder"] if runner else 0,
+                   runner_ghosts=runner.inventory["ghost_mode"] if runner else 0)
+
+    def counter_key(self):
+        keys = self.board.counter_keys
+        return (keys[0][min(self.moves_left, MAX_COUNTER)]
+                ^ keys[1][min(self.catcher_boost, MAX_COUNTER)] ^ keys[2][min(self.runner_boost, MAX_COUNTER)]
+                ^ keys[3][min(self.catcher_walls, MAX_COUNTER)] ^ keys[4][min(self.catcher_ghosts, MAX_COUNTER)]
+                ^ keys[5][min(self.runner_walls, MAX_COUNTER)] ^ keys[6][min(self.runner_ghosts, MAX_COUNTER)])
+
+    def is_free(self, cell):
+        return self.board.env.walkable[cell] == 1 and cell not in self.walls
+
+    def positions(self):
+        """((row, col) of the Catcher, (row, col) of the Runner)."""
+        cols = self.board.cols
+        return divmod(self.catcher, cols), divmod(self.runner, cols)
+
+    def captured(self):
+        """GameSimulator.can_capture: same cell or diagonal neighbors."""
+        cols = self.board.cols
+        row_diff = abs(self.catcher // cols - self.runner // cols)
+        col_diff = abs(self.catcher % cols - self.runner % cols)
+        return (row_diff == 0 and col_diff == 0) or (row_diff == 1 and col_diff == 1)
+
+    def legal_actions(self):
+        """
+        Action codes for the side to move: moves, ghost moves into inner walls, walls on free
+        neighbor cells, or [STAY] when there is nothing else.
+        """
+        board = self.board
+        catcher_side = self.side == CATCHER
+        cell = self.catcher if catcher_side else self.runner
+        has_ghost = (self.catcher_ghosts if catcher_side else self.runner_ghosts) > 0
+        has_wall = (self.catcher_walls if catcher_side else self.runner_walls) > 0
+
+        actions = []
+        for direction in range(4):
+            target = board.neighbor(cell, direction)
+            if target < 0:
+                continue
+            if self.is_free(target):
+                actions.append(MOVE * 4 + direction)
+                if has_wall:
+                    actions.append(WALL * 4 + direction)
+            elif has_ghost:
+                row, col = divmod(target, board.cols)
+                if 0 < row < board.rows - 1 and 0 < col < board.cols - 1:
+                    actions.append(GHOST * 4 + direction)
+        return actions or [STAY]
+
+    def apply(self, action):
+        """Play one move of the side to move (a legal action code)."""
+        self.history.append((self.catcher, self.runner, self.side, self.moves_left, self.catcher_boost,
+                             self.runner_boost, self.catcher_walls, self.catcher_ghosts, self.runner_walls,
+                             self.runner_ghosts, self.power_ups, self.walls, self.key))
+        board = self.board
+        zobrist = board.zobrist
+        catcher_side = self.side == CATCHER
+        key = self.key ^ self.counter_key()
+        cell = self.catcher if catcher_side else self.runner
+
+        if action != STAY:
+            kind = action >> 2
+            target = cell + board.offsets[action & 3]
+            if kind == WALL:
+                self.walls = self.walls + (target,)
+                key ^= zobrist.temporary_wall_keys[target]
+                if catcher_side:
+                    self.catcher_walls -= 1
+                else:
+                    self.runner_walls -= 1
+            else:
+                if kind == GHOST:
+                    if catcher_side:
+                        self.catcher_ghosts -= 1
+                    else:
+                        self.runner_ghosts -= 1
+                cell = target
+
+        # Power-up under the agent after the move
+        index = board.power_up_index.get(cell)
+        if index is not None and self.power_ups >> index & 1:
+            power_type = board.power_up_types[index]
+            if power_type == TELEPORT:
+                other = self.runner if catcher_side else self.catcher
+                for corner in board.corners:
+                    if corner != other and corner != cell:
+                        cell = corner
+                        break
+            else:
+                self.power_ups &= ~(1 << index)
+                key ^= board.power_up_keys[index]
+                if power_type == SPEED_BOOST:
+                    if catcher_side:
+                        self.catcher_boost = SPEED_BOOST_TURNS
+                    else:
+                        self.runner_boost = SPEED_BOOST_TURNS
+                elif power_type == WALL_BUILDER:
+                    if catcher_side:
+                        self.catcher_walls += 1
+                    else:
+                        self.runner_walls += 1
+                elif power_type == GHOST_MODE:
+                    if catcher_side:
+                        self.catcher_ghosts += 1
+                    else:
+                        self.runner_ghosts += 1
+
+        if catcher_side:
+            key ^= zobrist.catcher_keys[self.catcher] ^ zobrist.catcher_keys[cell]
+            self.catcher = cell
+        else:
+            key ^= zobrist.runner_keys[self.runner] ^ zobrist.runner_keys[cell]
+            self.runner = cell
+
+        # End of the turn: the boost wears off by one and the other side moves
+        self.moves_left -= 1
+        if self.moves_left == 0:
+            if catcher_side:
+                if self.catcher_boost > 0:
+                    self.catcher_boost -= 1
+                self.side = RUNNER
+                self.moves_left = 2 if self.runner_boost > 0 else 1
+            else:
+                if self.runner_boost > 0:
+                    self.runner_boost -= 1
+                self.side = CATCHER
+                self.moves_left = 2 if self.catcher_boost > 0 else 1
+            key ^= zobrist.side_key
+
+        self.key = key ^ self.counter_key()
+
+    def undo(self):
+        (self.catcher, self.runner, self.side, self.moves_left, self.catcher_boost, self.runner_boost,
+         self.catcher_walls, self.catcher_ghosts, self.runner_walls, self.runner_ghosts,
+         self.power_ups, self.walls, self.key) = self.history.pop()
@@ -1,27 +1,10 @@
 from environment.grid import GridEnvironment
+from environment.maps import load_map
 from agents.catcher import Catcher
 from agents.runner import Runner
 from game.simulator import GameSimulator
 
-map_data = [
-    "#################",
-    "#...............#",
-    "#.#####...#.#...#",
-    "#.#.......#.#...#",
-    "#.#.###.###.###.#",
-    "#.#.#...........#",
-    "#.#.#...###.###.#",
-    "#.........#.#...#",
-    "#...###...#.#...#",
-    "#...###.........#",
-    "#...###...#######",
-    "#.........#.....#",
-    "#.#...#.#.#...#.#",
-    "#.#...#.#.#...#.#",
-    "#.#####.#.....#.#",
-    "#.......#.....#.#",
-    "#################"
-]
+map_data = load_map("classic")
 
 env = GridEnvironment(map_data)
 
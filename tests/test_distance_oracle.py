@@ -0,0 +1,71 @@
+import random
+import time
+import numpy as np
+from environment.grid import GridEnvironment, UNREACHABLE
+from environment.maps import load_map
+from environment.map_generator import generate_map
+from algorithms.distance_oracle import DistanceOracle
+
+
+def expected_distance(env, start, goal):
+    """Reference from a fresh distance field, with the oracle's rules for cells inside walls."""
+    if start == goal:
+        return 0
+    if env.grid[goal] == 1:
+        return float('inf')
+    field = env.distance_field(goal)
+    if env.grid[start] == 0:
+        distance = field[start]
+    else:
+        cell = start[0] * env.cols + start[1]
+        distance = min((field[divmod(n, env.cols)] for n in env.free_neighbors(cell).tolist()), default=UNREACHABLE) + 1
+    return float('inf') if distance >= UNREACHABLE else int(distance)
+
+
+def test_distances_follow_walls_placed_and_removed():
+    rng = random.Random(0)
+    for trial in range(6):
+        data = load_map("classic") if trial == 0 else generate_map(["maze", "rooms", "open"][trial % 3], 25, 31, seed=trial)
+        env = GridEnvironment(data)
+        oracle = DistanceOracle(env)
+        free = env.get_free_cells()
+        placed = []
+        for step in range(20):
+            if rng.random() < 0.5:
+                pos = rng.choice(free)
+                if env.grid[pos] == 0:
+                    env.place_wall(pos)
+                    placed.append(pos)
+            if placed and rng.random() < 0.35:
+                env.remove_wall(placed.pop(rng.randrange(len(placed))))
+            for _ in range(15):
+                start, goal = rng.choice(free), rng.choice(free)
+                assert oracle.distance(start, goal) == expected_distance(env, start, goal), (trial, step, start, goal)
+
+
+def test_rows_are_filled_lazily():
+    env = GridEnvironment(load_map("classic"))
+    oracle = DistanceOracle(env)
+    assert oracle.dirty.all()
+
+    free = env.get_free_cells()
+    oracle.distance(free[0], free[-1])
+    assert np.count_nonzero(~oracle.dirty) == 1
+
+
+def test_size_limit():
+    env = GridEnvironment(generate_map("open", 129, 129, seed=0))
+    assert not DistanceOracle.fits(env)
+    assert DistanceOracle.fits(GridEnvironment(load_map("classic")))
+
+
+def test_row_fill_time_at_the_size_limit():
+    env = GridEnvironment(generate_map("open", 65, 65, seed=0))
+    assert DistanceOracle.fits(env) and len(env.get_free_cells()) > DistanceOracle.MAX_CELLS // 2
+
+    oracle = DistanceOracle(env)
+    start_time = time.perf_counter()
+    for i in range(10):
+        oracle.fill_row(i)
+    # About 3 ms a row at MAX_CELLS; the bound leaves room for slow machines
+    assert (time.perf_counter() - start_time) / 10 < 0.05
@@ -0,0 +1,81 @@
+import random
+from environment.grid import GridEnvironment, DIRECTIONS, DIRECTION_DELTAS, UNREACHABLE
+from environment.maps import load_map
+from environment.map_generator import generate_map
+from algorithms.dstar_lite import DStarLite
+
+
+def step(pos, direction):
+    dr, dc = DIRECTION_DELTAS[DIRECTIONS.index(direction)]
+    return (pos[0] + dr, pos[1] + dc)
+
+
+def play(env, rng, moves):
+    """Walk the Catcher along D* Lite's moves while walls come and go and the Runner moves or jumps."""
+    planner = DStarLite(env)
+    free = env.get_free_cells()
+    catcher, runner = free[0], free[-1]
+    for _ in range(moves):
+        if rng.random() < 0.15:
+            env.place_wall(rng.choice([pos for pos in env.get_free_cells() if pos not in (catcher, runner)]))
+
+        action = planner.get_next_action(catcher, runner)
+        field = env.distance_field(runner)
+        if field[catcher] >= UNREACHABLE:
+            assert action is None
+        else:
+            # A shortest-path step, and the same one a search from scratch picks
+            assert action is not None and field[step(catcher, action)] == field[catcher] - 1
+            assert action == DStarLite(env).get_next_action(catcher, runner)
+            catcher = step(catcher, action)
+        if catcher == runner:
+            break
+
+        neighbors = [step(runner, direction) for direction in DIRECTIONS if env.is_valid_move(runner, direction)]
+        if neighbors:
+            runner = rng.choice(neighbors)
+        if rng.random() < 0.2:
+            runner = rng.choice([pos for pos in env.get_free_cells() if pos != catcher])
+        env.update_temporary_walls()
+
+
+def test_steps_follow_walls_and_runner_moves():
+    for seed in range(12):
+        rng = random.Random(seed)
+        data = load_map("classic") if seed % 4 == 0 else generate_map(["maze", "rooms", "open"][seed % 3], 21, 25, seed=seed)
+        play(GridEnvironment(data), rng, moves=60)
+
+
+def test_key_modifier_stays_bounded():
+    env = GridEnvironment(load_map("classic"))
+    rng = random.Random(0)
+    planner = DStarLite(env)
+    free = env.get_free_cells()
+    catcher = free[0]
+    resets = 0
+    for _ in range(200):
+        # The Runner jumps far away every turn, so km grows quickly
+        runner = rng.choice([pos for pos in free if abs(pos[0] - catcher[0]) + abs(pos[1] - catcher[1]) > 6])
+        action = planner.get_next_action(catcher, runner)
+        field = env.distance_field(runner)
+        assert field[step(catcher, action)] == field[catcher] - 1
+        assert planner.km <= planner.key_scale + env.rows + env.cols
+        resets += planner.km == 0
+        catcher = step(catcher, action)
+    assert resets > 1
+
+
+def test_incremental_search_expands_less_than_fresh_searches():
+    env = GridEnvironment(generate_map("open", 41, 41, seed=3))
+    free = env.get_free_cells()
+    catcher, runner = free[0], free[-1]
+    planner = DStarLite(env)
+    incremental = fresh = 0
+    for _ in range(30):
+        action = planner.get_next_action(catcher, runner)
+        incremental += planner.stats.nodes_expanded
+        scratch = DStarLite(env)
+        scratch.get_next_action(catcher, runner)
+        fresh += scratch.stats.nodes_expanded
+        catcher = step(catcher, action)
+    assert incremental < fresh / 2
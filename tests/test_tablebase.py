@@ -0,0 +1,93 @@
+import time
+import numpy as np
+import pytest
+from environment.grid import GridEnvironment, DIRECTION_DELTAS
+from environment.maps import load_map
+from environment.map_generator import generate_map
+from algorithms.tablebase import ESCAPE, MAX_CELLS, Tablebase, solve
+
+
+def reference_solve(grid):
+    """Plain value iteration over dicts, the rules of solve() without numpy."""
+    rows, cols = grid.shape
+    free = [(r, c) for r in range(rows) for c in range(cols) if grid[r, c] == 0]
+    moves = {pos: [(pos[0] + dr, pos[1] + dc) for dr, dc in DIRECTION_DELTAS
+                   if 0 <= pos[0] + dr < rows and 0 <= pos[1] + dc < cols and grid[pos[0] + dr, pos[1] + dc] == 0] or [pos]
+             for pos in free}
+
+    def caught(c, r):
+        return (abs(c[0] - r[0]), abs(c[1] - r[1])) in ((0, 0), (1, 1))
+
+    catcher = {(c, r): 0 if caught(c, r) else ESCAPE for c in free for r in free}
+    runner = dict(catcher)
+    changed = True
+    while changed:
+        changed = False
+        for c, r in catcher:
+            if caught(c, r):
+                continue
+            best = min(runner[m, r] for m in moves[c])
+            value = ESCAPE if best == ESCAPE else best + 1
+            if value != catcher[c, r]:
+                catcher[c, r] = value
+                changed = True
+        for c, r in runner:
+            if caught(c, r):
+                continue
+            best = max(catcher[c, m] for m in moves[r])
+            value = ESCAPE if best == ESCAPE else best + 1
+            if value != runner[c, r]:
+                runner[c, r] = value
+                changed = True
+    return free, catcher, runner
+
+
+@pytest.mark.parametrize("grid", [
+    GridEnvironment(generate_map("rooms", 11, 13, seed=1)).grid,
+    GridEnvironment(generate_map("maze", 11, 11, seed=2)).grid,
+    # Dead ends, a stuck cell and a sealed pocket
+    GridEnvironment(["#######", "#.#.#.#", "#.....#", "###.###", "#.#####", "#######"]).grid,
+])
+def test_solve_matches_reference(grid):
+    values = solve(grid)
+    free, catcher, runner = reference_solve(grid)
+    for i, c in enumerate(free):
+        for j, r in enumerate(free):
+            assert values[0, i, j] == catcher[c, r], (c, r)
+            assert values[1, i, j] == runner[c, r], (c, r)
+
+
+def test_size_limit():
+    assert solve(np.zeros((12, 12), dtype=np.uint8)).dtype == np.uint16
+    side = int(MAX_CELLS ** 0.5) + 1
+    with pytest.raises(ValueError):
+        solve(np.zeros((side, side), dtype=np.uint8))
+
+
+def test_solve_time():
+    grid = GridEnvironment(generate_map("open", 33, 33, seed=0)).grid
+    start_time = time.perf_counter()
+    values = solve(grid)
+    # About 0.4 s here; the bound leaves room for slow machines
+    assert time.perf_counter() - start_time < 5
+    n = int(np.count_nonzero(grid == 0))
+    assert values.shape == (2, n, n) and values.dtype == np.uint16
+
+
+def test_table_stops_applying_once_a_wall_is_placed(tmp_path):
+    env = GridEnvironment(load_map("classic"))
+    with pytest.raises(FileNotFoundError):
+        Tablebase.load(env, directory=tmp_path, build=False)
+
+    table = Tablebase.load(env, directory=tmp_path)
+    free = env.get_free_cells()
+    catcher_pos, runner_pos = free[0], free[-1]
+    assert table.best_move(env, catcher_pos, runner_pos, is_catcher=False) is not None
+
+    wall = next(pos for pos in free[1:-1] if abs(pos[0] - runner_pos[0]) + abs(pos[1] - runner_pos[1]) > 2)
+    env.place_wall(wall)
+    assert not table.applies_to(env)
+    assert table.best_move(env, catcher_pos, runner_pos, is_catcher=False) is None
+
+    env.remove_wall(wall)
+    assert table.applies_to(env)